@@ -0,0 +1,43 @@
+import threading
+from time import perf_counter
+from typing import Callable, Generic, Optional, TypeVar, Union
+
+T = TypeVar("T")
+
+class BackgroundLoader(Generic[T]):
+    """BackgroundLoader - Loads a value (a words dictionary, a cache...) on a background thread.
+        Loading starts right away, and the first {get} waits for it only if it isn't done yet.
+        An error raised while loading is raised again by every get."""
+    def __init__(self, load: Callable[[], T], name: str = "loader"):
+        self._load = load
+        self._value: Optional[T] = None
+        self._error: Optional[BaseException] = None
+        self._done = threading.Event()
+        #seconds the loading took, once done
+        self.seconds = 0.0
+        threading.Thread(target=self._run, name=name, daemon=True).start()
+
+    def get(self) -> T:
+        """Return the loaded value, waiting for the loading to finish."""
+        self._done.wait()
+        if (self._error is not None):
+            raise self._error
+        assert self._value is not None
+        return self._value
+
+    def is_done(self) -> bool:
+        return self._done.is_set()
+
+    def _run(self):
+        start_time = perf_counter()
+        try:
+            self._value = self._load()
+        except BaseException as error:
+            self._error = error
+        finally:
+            self.seconds = perf_counter() - start_time
+            self._done.set()
+
+def resolve(value: Union[T, BackgroundLoader[T]]) -> T:
+    """Return the given value, or its loaded value if it's a {BackgroundLoader}."""
+    return value.get() if isinstance(value, BackgroundLoader) else value
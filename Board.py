@@ -1,16 +1,22 @@
 import tkinter as tk
 from typing import List, Optional, Tuple
 from Cell import Cell
+from ex11_utils import get_neighbor_masks
+
+MIN_FONT_SIZE = 6
 
 class Board:
     """Board - Represents a board of cells.
         The board has a GUI representation of a list of {Cell}s.
         The board is initiated with empty cells (None) for a given size,
-        and later on can be populated with new {Cell}s."""
-    OPTIONAL_MOVES = [(-1, -1), (-1, 0), (1, 0), (0, -1), (0, 0), (0, 1), (1, 1), (-1, 1), (1, -1)]
-
+        and later on can be populated with new {Cell}s. Its GUI buttons are
+        created once and reused by every later board."""
     def __init__(self, board_size: int):
         self.board: List[List[Optional[Cell]]] = self._init_board(board_size)
+        #pooled GUI buttons, created by the first gui() call
+        self.gui_board: List[List[tk.Button]] = []
+        #shared per board size - neighbors of each cell index, as a bitmask
+        self.neighbor_masks = get_neighbor_masks(board_size, board_size)
 
     def _init_board(self, board_size: int) -> List[List[Optional[Cell]]]:
         """Initiate an empty board of given size."""
@@ -35,16 +41,18 @@ class Board:
             str_board.append(row)
         return str_board
     
+    def get_cell_index(self, location: Tuple[int, int]) -> int:
+        """Return the flat index of a location on the board."""
+        x, y = location
+        return x * len(self.board[0]) + y
+
     def is_move_valid(self, new_location: Tuple[int, int], current_location: Tuple[int, int]):
         """For a given new location, check if the move is valid from a given current location
             on the board."""
-        new_x, new_y = new_location
-        curr_x, curr_y = current_location
-        for move in self.OPTIONAL_MOVES:
-            move_x, move_y = move
-            if (curr_x + move_x == new_x and curr_y + move_y == new_y):
-                return True
-        return False
+        if (not self._is_valid_location(new_location) or not self._is_valid_location(current_location)):
+            return False
+        current_index = self.get_cell_index(current_location)
+        return bool(self.neighbor_masks[current_index] >> self.get_cell_index(new_location) & 1)
     
     def _is_valid_location(self, location: Tuple[int, int]) -> bool:
         """Check if the location is on the board's boundaries."""
@@ -63,16 +71,26 @@ class Board:
         return True
     
     def gui(self, cell_height, cell_width) -> List[List[tk.Button]]:
-        """Create the GUI representation of the board."""
+        """Create the GUI representation of the board. The letters are sized by the cells.
+            Once created, the same buttons are updated in a single pass to show the current cells."""
+        if (len(self.gui_board) > 0):
+            for row in range(len(self.board)):
+                for col in range(len(self.board[0])):
+                    cell = self.board[row][col]
+                    if (cell is not None):
+                        cell.update_gui(self.gui_board[row][col])
+            return self.gui_board
+        font_size = max(MIN_FONT_SIZE, min(cell_height, cell_width) * 6 // 25)
         gui_board = []
         for row in range(len(self.board)):
             curr_row = []
             for col in range(len(self.board[0])):
                 cell = self.board[row][col]
                 if (cell is not None):
-                    gui_cell = cell.gui()
+                    gui_cell = cell.gui(font_size)
                     gui_cell.place(x=col * cell_width + 22, y=row * cell_height + 22,
                                    width=cell_width, height=cell_height)
                     curr_row.append(gui_cell)
             gui_board.append(curr_row)
+        self.gui_board = gui_board
         return gui_board
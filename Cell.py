@@ -3,6 +3,8 @@ import tkinter as tk
 class Cell:
     """Cell - Represents a single cell of letters.
         The cell has a GUI representation of type {tk.Button}."""
+    TEXT_COLOR = "black"
+
     def __init__(self, letters: str, frame: tk.Frame, command, bg: str):
         self.letters = letters
         self.frame = frame
@@ -12,14 +14,23 @@ class Cell:
     def get_content(self):
         """Return the Cell's letters."""
         return self.letters
+
+    def set_content(self, letters: str):
+        """Replace the Cell's letters, to reuse the cell on a new board."""
+        self.letters = letters
         
-    def gui(self) -> tk.Button:
+    def gui(self, font_size: int = 24) -> tk.Button:
         """Create the GUI representation of the cell."""
         return tk.Button(
             self.frame,
             text=self.letters,
-            font=("Arial", 24),
+            font=("Arial", font_size),
             width=5, height=2,
             command=self.command,
-            bg=self.bg
+            bg=self.bg,
+            fg=self.TEXT_COLOR
             )
+
+    def update_gui(self, gui_cell: tk.Button):
+        """Update an existing GUI representation to show the cell, as it was when created."""
+        gui_cell.config(text=self.letters, bg=self.bg, fg=self.TEXT_COLOR, state=tk.NORMAL)
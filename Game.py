@@ -1,51 +1,66 @@
+from BackgroundLoader import BackgroundLoader, resolve
 from Board import Board
 from Cell import Cell
+from GameEngine import GameEngine, Difficulty
 from GameTimer import GameTimer
+from HintSolver import HintSolver
+from SolutionCache import SolutionCache
+import logging
 import tkinter as tk
-from typing import Literal, Optional, Tuple, List, Dict, Set
-from boggle_board_randomizer import randomize_board
-from ex11_utils import is_valid_path, max_score_paths
-from random import randint
+from typing import Literal, Optional, Tuple, List, Set, Union
+from ex11_utils import PrefixIndex
 
 Path = List[Tuple[int, int]]
 
-class Difficulty:
-    EASY = "easy"
-    MEDIUM = "mid"
-    HARD = "hard"
+logger = logging.getLogger(__name__)
 
 class Game:
     """Game - Boggle Game.
         The game is initialized with a board size, the time for its timer,
-        words dictionary set and an optional difficulty (of type {Difficulty}).
-        Creates the GUI representation and flow of the Boggle game."""
+        words dictionary set (or its {BackgroundLoader}, still loading) and an optional
+        difficulty (of type {Difficulty}).
+        Creates the GUI representation and flow of the Boggle game, the game's
+        rules and state are kept by its {GameEngine}."""
 
     BACKGROUND_COLOR = "lightblue"
     BOARD_COLOR = "lightgrey"
     SELECTED_CELL_COLOR = "cyan"
-
-    def __init__(self, board_size: int, countdown: Tuple[int, int], words: Set[str],
-                 difficulty: Literal["easy", "mid", "hard"]=Difficulty.EASY):
+    CELL_TEXT_COLOR = "black"
+    #cells that can't continue the current word, and current word colors
+    DEAD_END_TEXT_COLOR = "grey"
+    WORD_TEXT_COLOR = "green"
+    HINT_TEXT = "Get Hint"
+    HINT_COMPUTING_TEXT = "Computing..."
+    HINT_POLL_INTERVAL = 100
+    #cells share the board's pixels, big boards grow past it rather than shrink cells too small
+    BOARD_PIXELS = 400
+    MIN_CELL_PIXELS = 30
+    def __init__(self, board_size: int, countdown: Tuple[int, int],
+                 words: Union[Set[str], PrefixIndex, BackgroundLoader[PrefixIndex]],
+                 difficulty: Literal["easy", "mid", "hard"]=Difficulty.EASY,
+                 cache: Union[None, SolutionCache, BackgroundLoader[SolutionCache]] = None):
         #general
+        self.board_size = board_size
+        self.cell_pixels = max(self.MIN_CELL_PIXELS, self.BOARD_PIXELS // board_size)
         self.board: Board = Board(board_size)
         self.window = tk.Tk()
         self.frame = tk.Frame(self.window, bg=self.BACKGROUND_COLOR)
         self.canvas: tk.Canvas
         self._init_window()
         self._init_background()
-        self.all_words: Set[str] = words
-        self.running = False
-        self.words_bank: Dict[str, Path] = {}
-        self.curr_path: Path = []
-        self.curr_word: str = ""
-        self.curr_score = 0
-        self.best_score = 0
-        self.solutions: List[Path] = []
+        self.engine = GameEngine(words, board_size, countdown, difficulty)
+        self.dead_end_cells: List[Tuple[int, int]] = []
+        self.gui_board: List[List[tk.Button]] = []
         self.difficulty = difficulty
+        #hints are solved in the background as soon as a board is created - a dictionary
+        # still loading is waited for by the solver's thread, not the window
+        hint_words = words if isinstance(words, BackgroundLoader) else self.engine.all_words
+        self.hint_solver = HintSolver(hint_words, cache)
+        self.hint_poll_id: Optional[str] = None
         #timer
         minutes, seconds = countdown
         self.timer = GameTimer(minutes, seconds, self.BACKGROUND_COLOR)
-        self.timer_id: Optional[str]
+        self.timer_id: Optional[str] = None
         #buttons
         self._declare_buttons()
         self._add_timer()
@@ -55,6 +70,23 @@ class Game:
         """Main game command - starting the game."""
         self.window.mainloop()
 
+    def pause(self):
+        """Pause the running game - the engine stops its time, and the timer shows it."""
+        if (self.engine.running and not self.engine.is_paused()):
+            self.engine.pause()
+            self.timer.pause(self.engine.get_remaining())
+            if (self.timer_id is not None):
+                self.window.after_cancel(self.timer_id)
+                self.timer_id = None
+
+    def resume(self):
+        """Resume the paused game, the timer follows the engine's new deadline."""
+        if (self.engine.is_paused()):
+            self.engine.resume()
+            assert self.engine.deadline is not None
+            self.timer.resume(self.engine.deadline)
+            self._start_timer()
+
     #general GUI functions
     def _init_window(self):
         self.window.title("Boggle")
@@ -63,7 +95,8 @@ class Game:
         """Initialize all the major background GUI elements of the game."""
         self.frame.pack(fill=tk.BOTH, expand=True)
         #general canvas (will be filled later)
-        self.canvas = tk.Canvas(self.frame, width=400, height=400, bg=self.BOARD_COLOR)
+        board_pixels = self.board_size * self.cell_pixels
+        self.canvas = tk.Canvas(self.frame, width=board_pixels, height=board_pixels, bg=self.BOARD_COLOR)
         self.canvas.grid(row=0, column=0, columnspan=1, padx=20, pady=20)
         #words section - canvas, current word, section label and finished words
         words_section_canvas = tk.Canvas(self.frame, width=200, height=100, bg="white")
@@ -123,7 +156,7 @@ class Game:
 
     def _add_hint_button(self):
         """Add the Get Hint button to the GUI."""
-        self.hint_button = tk.Button(self.frame, text="Get Hint", command=self._get_hint)
+        self.hint_button = tk.Button(self.frame, text=self.HINT_TEXT, command=self._get_hint)
         self.hint_button.grid(row=4, column=2, columnspan=2, padx=20, pady=10)
 
     def _add_finish_button(self):
@@ -136,10 +169,10 @@ class Game:
     #buttons functionality functions
     def _start_game(self):
         """Starts the game - start the timer, add the in-game buttons and create the board."""
-        #start game and timer
-        self.running = True
-        self.timer.start()
-        self.timer_id = self._start_timer()
+        #start game and timer, the timer shows the engine's deadline
+        self.engine.new_game()
+        self.timer.start(self.engine.deadline)
+        self._start_timer()
         #add in-game buttons
         self._add_finish_button()
         self._add_reset_word_button()
@@ -149,36 +182,45 @@ class Game:
         #reset previous session
         self._reset_game_progress()
         #add board
-        self._create_board(self.board, randomize_board(), self.frame, self.BOARD_COLOR)
-        self.gui_board = self.board.gui(100, 100)
+        self._create_board(self.board, self.engine.board, self.frame, self.BOARD_COLOR)
+        #buttons are created by the first game only, later games update them
+        self.gui_board = self.board.gui(self.cell_pixels, self.cell_pixels)
+        if (self.difficulty != Difficulty.HARD):
+            self._start_hint_solver()
 
     def _check_word(self):
         """Check the current submitted word against the words dictionary.
             Update the score accordingly."""
-        opt_word = is_valid_path(self.board.get_str_board(), self.curr_path, self.all_words)
+        path = self.engine.curr_path
+        opt_word = self.engine.check_word()
+        if (not self.engine.running):
+            #the tick may be late, the deadline isn't
+            self._finish_game()
+            return
         if (opt_word is not None):
-            if (self.curr_word not in self.words_bank.keys()):
-                self.words_bank[opt_word] = self.curr_path
-                self.curr_score += self._get_score_from_path(self.curr_path)
-                self._update_score_display()
-                self._update_found_words_display(opt_word)
-                if (self.curr_path in self.solutions):
-                    self.solutions.remove(self.curr_path)
-        self._reset_word()
+            self._update_score_display()
+            self._update_found_words_display(opt_word)
+        self._reset_word_display(path)
         self._update_hint_display(tk.NORMAL)
 
     def _reset_word(self):
         """"Reset current path."""
-        for location in self.curr_path:
-            self._update_curr_cell_display_deselected(location)
-        self.curr_path = []
-        self.curr_word = ""
-        self._update_curr_word_display()
+        path = self.engine.curr_path
+        self.engine.reset_word()
+        self._reset_word_display(path)
 
     def _get_hint(self):
         """Add cells to the current path for an optional max-score word on the board.
-            Number of cells added - according to the difficutly."""
-        hint_cells = self._get_optional_hint_cells(self.difficulty)
+            Number of cells added - according to the difficutly.
+            While the board is still being solved, show it's computing and give
+            a quick hint from the first words streamed by the solver (so does a failed solve)."""
+        if (not self.hint_solver.is_ready()):
+            if (not self.hint_solver.has_failed()):
+                self._update_hint_text_display(self.HINT_COMPUTING_TEXT)
+            hint_cells = self.engine.get_quick_hint_cells()
+        else:
+            hint_cells = self.engine.get_hint_cells(self.hint_solver.poll())
+            self._log_hint_stats()
         if (hint_cells is not None):
             for cell in hint_cells:
                 x, y = cell
@@ -187,43 +229,74 @@ class Game:
     def _finish_game(self):
         """Finish the current run - set the high score, stop the timer, disable the board
             and change buttons the out-game view."""
-        self.best_score = self.curr_score if self.curr_score > self.best_score else self.best_score
+        self.engine.finish_game()
         self._update_best_score_display()
         self.timer.stop()
-        self.running = False
         self._disable_board()
         self._add_start_button()
         if (self.timer_id is not None):
             self.window.after_cancel(self.timer_id)
+            self.timer_id = None
+        self._stop_hint_solver()
 
 
     #game flow functions
     def _create_board(self, board: Board, cells: List[List[str]], frame: tk.Frame, cell_bg: str):
-        """Create the board with a given letters list and background color."""
+        """Create the board with a given letters list and background color.
+            Cells of a previous board are reused, only their letters change."""
         for i in range(len(cells)):
             for j in range (len(cells[0])):
+                cell = board.get_cell((i, j))
+                if (cell is not None):
+                    cell.set_content(cells[i][j])
+                    continue
                 new_cell = Cell(cells[i][j], frame,
                                 command=lambda r=i, c=j: self._add_cell_to_path(r, c),
                                 bg=cell_bg)
                 board.insert_cell(new_cell, (i, j))
     
     def _reset_game_progress(self):
-        """"Reset the game progress - reset all in-game data."""
-        self.curr_path = []
-        self.words_bank = {}
+        """"Reset the game progress - reset all the in-game displays."""
+        self.dead_end_cells = []
         self._reset_found_words_display()
-        self.curr_word = ""
         self._update_curr_word_display()
-        self.curr_score = 0
         self._update_score_display()
         self._enable_board()
 
+    def _start_hint_solver(self):
+        """Start solving the current board for hints, and poll for the result."""
+        self._stop_hint_solver()
+        self.hint_solver.start(self.engine.board)
+        self._poll_hint_solver()
+
+    def _poll_hint_solver(self):
+        """Loop for checking the hint solver until its result is ready, or it failed -
+            hints then stay quick hints for the rest of the game."""
+        if (self.hint_solver.is_ready() or self.hint_solver.has_failed()):
+            self.hint_poll_id = None
+            self._update_hint_text_display(self.HINT_TEXT)
+            if (self.hint_solver.error is not None):
+                logger.error("hint solve failed: %r", self.hint_solver.error)
+        else:
+            self.hint_poll_id = self.window.after(self.HINT_POLL_INTERVAL, self._poll_hint_solver)
+
+    def _stop_hint_solver(self):
+        """Cancel the running hint job and its polling."""
+        self.hint_solver.cancel()
+        if (self.hint_poll_id is not None):
+            self.window.after_cancel(self.hint_poll_id)
+            self.hint_poll_id = None
+
     def _start_timer(self):
-        """Loop for updating the timer while the game & timer are running."""
-        if (self.running and self.timer.get_timer_state()):
-            self.timer.update_time()
-            return self.window.after(1000, self._start_timer)
-        elif (self.running):
+        """Loop for updating the timer while the game & timer are running.
+            Every tick is scheduled for the timer's next whole second, so late ticks don't add up."""
+        self.timer_id = None
+        if (self.engine.running and self.timer.get_timer_state()):
+            delay = self.timer.update_time()
+            if (self.timer.get_timer_state() and not self.engine.is_time_up()):
+                self.timer_id = self.window.after(delay, self._start_timer)
+                return
+        if (self.engine.running):
             self._finish_game()
     
     def _add_timer(self):
@@ -231,22 +304,40 @@ class Game:
 
     def _disable_board(self):
         """Disable the board GUI representation."""
-        str_board = self.board.get_str_board()
-        for i in range(len(str_board)):
-            for j in range (len(str_board[0])):
-                self._disable_cell_display((i, j))
+        for gui_row in self.gui_board:
+            for gui_cell in gui_row:
+                gui_cell.config(bg=self.BOARD_COLOR, state=tk.DISABLED)
 
     def _enable_board(self):
         """Enable the board GUI representation."""
-        str_board = self.board.get_str_board()
-        for i in range(len(str_board)):
-            for j in range (len(str_board[0])):
-                self._enable_cell_display((i, j))
+        for gui_row in self.gui_board:
+            for gui_cell in gui_row:
+                gui_cell.config(state=tk.NORMAL)
 
 
     #GUI update functions
     def _update_curr_word_display(self):
-        self.curr_word_text.config(text=self.curr_word)
+        color = self.CELL_TEXT_COLOR
+        if (self.engine.is_dead_prefix()):
+            color = self.DEAD_END_TEXT_COLOR
+        elif (self.engine.is_curr_word()):
+            color = self.WORD_TEXT_COLOR
+        self.curr_word_text.config(text=self.engine.curr_word, fg=color)
+
+    def _update_dead_ends_display(self):
+        """Grey out the free neighbors of the path's last cell that can't continue the current word."""
+        for x, y in self.dead_end_cells:
+            self.gui_board[x][y].config(fg=self.CELL_TEXT_COLOR)
+        self.dead_end_cells = self.engine.get_dead_end_cells()
+        for x, y in self.dead_end_cells:
+            self.gui_board[x][y].config(fg=self.DEAD_END_TEXT_COLOR)
+
+    def _reset_word_display(self, path: Path):
+        """Show the current path was reset, deselecting the cells of its previous path."""
+        for location in path:
+            self._update_curr_cell_display_deselected(location)
+        self._update_curr_word_display()
+        self._update_dead_ends_display()
 
     def _update_curr_cell_display_selected(self, location: Tuple[int, int]):
         cell = self.board.get_cell(location)
@@ -267,67 +358,40 @@ class Game:
         self.words_section_list.delete(0, tk.END)
 
     def _update_score_display(self):
-        self.curr_score_t.config(text=self.curr_score)
+        self.curr_score_t.config(text=self.engine.curr_score)
         
     def _update_best_score_display(self):
-        self.best_score_t.config(text=self.best_score)
+        self.best_score_t.config(text=self.engine.best_score)
 
     def _update_hint_display(self, mode: Literal['normal', 'active', 'disabled']):
         self.hint_button.config(state=mode)
 
-    def _disable_cell_display(self, location: Tuple[int, int]):
-        cell = self.board.get_cell(location)
-        if (cell is not None):
-            x, y = location
-            self.gui_board[x][y].config(bg=self.BOARD_COLOR, state=tk.DISABLED)
-            
-    def _enable_cell_display(self, location: Tuple[int, int]):
-        cell = self.board.get_cell(location)
-        if (cell is not None):
-            x, y = location
-            self.gui_board[x][y].config(state=tk.NORMAL)
+    def _update_hint_text_display(self, text: str):
+        self.hint_button.config(text=text)
 
 
     #util functions    
     def _add_cell_to_path(self, row, col):
         """If the given location is valid, add the cell to the current running path.
             Update the GUI accordingly."""
-        if (self._check_location_valid((row, col))):
-            letter = self.board.get_cell((row, col))
-            assert letter is not None
-            self.curr_path.append((row, col))
-            cell = self.board.get_cell((row, col))
-            self.curr_word += cell.get_content() if cell is not None else ""
+        if (self.engine.select_cell((row, col))):
             self._update_curr_cell_display_selected((row, col))
             self._update_curr_word_display()
+            self._update_dead_ends_display()
             self._update_hint_display(tk.DISABLED)
 
-    def _check_location_valid(self, location: Tuple[int, int]):
-        """Valid location = starting new path OR not in current path + valid move."""
-        if (len(self.curr_path) == 0):
-            return True
-        if (location in self.curr_path):
-            return False
-        return self.board.is_move_valid(location, self.curr_path[-1])
-
-    def _get_score_from_path(self, path: Path):
-        """Score is calculated by path length squared."""
-        return len(path) ** 2
-
-    def _get_optional_hint_cells(self, difficulty: str) -> List[Tuple[int, int]]:
-        """According to given difficulty, return list of hint cells of
-            a max-score word on the board."""
-        if (len(self.solutions) == 0):
-            self.solutions = max_score_paths(self.board.get_str_board(), set(self.all_words))
-        rand_i = randint(0, len(self.solutions) - 1)
-        hint_path = self.solutions[rand_i]
-        cutoff = 0
-        if (difficulty == Difficulty.EASY):
-            cutoff = len(hint_path) // 2
-        if (difficulty == Difficulty.MEDIUM):
-            cutoff = len(hint_path) // 3 or 1
-        return hint_path[0:cutoff]
-    
+    def _log_hint_stats(self):
+        """Log how the hints of the current board were solved."""
+        stats = self.hint_solver.stats
+        if (stats is not None and logger.isEnabledFor(logging.INFO)):
+            slowest_cell = max(stats.start_cell_times.items(), key=lambda item: item[1], default=None)
+            logger.info("hint: %d nodes, %d pruned, prefix %.4fs, search %.4fs, views %s, slowest start cell %s",
+                        stats.nodes, stats.pruned, stats.prefix_time, stats.search_time,
+                        stats.pass_times, slowest_cell)
+        cache = resolve(self.hint_solver.cache)
+        if (cache is not None and logger.isEnabledFor(logging.INFO)):
+            logger.info("hint cache: %s", cache.get_stats())
+
     #for debugging purposes
     def _word_from_path(self, path: Path) -> str:
         word = ""
@@ -0,0 +1,258 @@
+import time
+from typing import Iterable, List, Literal, Optional, Set, Tuple, Union
+from BackgroundLoader import BackgroundLoader, resolve
+from boggle_board_randomizer import BOARD_SIZE, randomize_board
+from SolutionStore import SolutionStore
+from ex11_utils import first_words, get_neighbor_masks, get_neighbors, Node, PrefixIndex, PREFIX_INDEX_TYPES
+from Trie import Trie
+
+Board = List[List[str]]
+Path = List[Tuple[int, int]]
+
+class Difficulty:
+    EASY = "easy"
+    MEDIUM = "mid"
+    HARD = "hard"
+
+class GameEngine:
+    """GameEngine - The rules and state of a Boggle game, without any UI.
+        The engine holds the board, the current path and word, the found words, the
+        score and the game's deadline. A UI (or a server session) drives it with
+        cells selected by the player, and shows its state. Boards are solved for hints
+        outside the engine, their max-score paths are handed to {get_hint_cells}."""
+    #words streamed for a quick hint while the board is still being solved
+    QUICK_HINT_WORDS = 20
+
+    def __init__(self, words: Union[Set[str], PrefixIndex, BackgroundLoader[PrefixIndex]],
+                 board_size: int = BOARD_SIZE, countdown: Tuple[int, int] = (3, 0),
+                 difficulty: Literal["easy", "mid", "hard"] = Difficulty.EASY):
+        #words are indexed once in a prefix tree, shared by all checks and hints - on first
+        # use. A dictionary still loading in the background only blocks a check or a hint,
+        # selected cells are stepped by the lexicon cursor once it's loaded
+        self._words = words
+        self._all_words: Optional[PrefixIndex] = None
+        self.board_size = board_size
+        minutes, seconds = countdown
+        self.duration = minutes * 60 + seconds
+        self.difficulty = difficulty
+        #shared per board size - neighbors of each cell index, as a list and as a bitmask
+        self.neighbors = get_neighbors(board_size, board_size)
+        self.neighbor_masks = get_neighbor_masks(board_size, board_size)
+        self.board: Board = []
+        self.running = False
+        #time.monotonic() time the running game ends at, None while paused (or not running)
+        self.deadline: Optional[float] = None
+        #remaining seconds of the paused game
+        self.paused_remaining: Optional[float] = None
+        self.best_score = 0
+        #found words, and the max-score words not found yet - hints are popped best first
+        self.words_bank = SolutionStore(board_size)
+        self.curr_path: Path = []
+        #bitmask of the cells in the current path, by cell index
+        self.curr_path_mask = 0
+        #lexicon cursor - the prefix node after each cell of the current path, None once no
+        # word starts with the current word. It lags behind the path while the words load
+        self.curr_nodes: List[Optional[Node]] = []
+        self.curr_word = ""
+        self.curr_score = 0
+        self.solutions = SolutionStore(board_size)
+        #whether the board's max-score paths were added to the solutions yet
+        self.solutions_loaded = False
+
+    @property
+    def all_words(self) -> PrefixIndex:
+        """The words prefix index, waiting for it to load (or building it) on first use."""
+        if (self._all_words is None):
+            words = resolve(self._words)
+            self._all_words = words if isinstance(words, PREFIX_INDEX_TYPES) else Trie(words)
+            self._words = None
+        return self._all_words
+
+    def words_ready(self) -> bool:
+        """Check if the words can be used without waiting for them to load."""
+        return (self._all_words is not None or not isinstance(self._words, BackgroundLoader) or
+                self._words.is_done())
+
+    def new_game(self, board: Optional[Board] = None):
+        """Start a new game on the given board, a random one if not given."""
+        self.board = board if board is not None else randomize_board(board_size=self.board_size)
+        self.words_bank.clear()
+        self.curr_score = 0
+        self.solutions.clear()
+        self.solutions_loaded = False
+        self.reset_word()
+        self.running = True
+        self.deadline = time.monotonic() + self.duration
+        self.paused_remaining = None
+
+    def finish_game(self):
+        """Finish the running game, keeping its score if it's the best one."""
+        if (self.running):
+            self.best_score = max(self.best_score, self.curr_score)
+        self.running = False
+        self.deadline = None
+        self.paused_remaining = None
+        self.solutions.clear()
+        self.solutions_loaded = False
+
+    def pause(self):
+        """Pause the running game - its time stops counting down, and no cell can be selected."""
+        if (self.running and self.deadline is not None):
+            self.paused_remaining = self.get_remaining()
+            self.deadline = None
+
+    def resume(self):
+        """Resume the paused game, with the time it had left."""
+        if (self.running and self.paused_remaining is not None):
+            self.deadline = time.monotonic() + self.paused_remaining
+            self.paused_remaining = None
+
+    def is_paused(self) -> bool:
+        return self.running and self.paused_remaining is not None
+
+    def get_remaining(self) -> float:
+        """Returns the remaining seconds of the running game."""
+        if (self.paused_remaining is not None):
+            return self.paused_remaining
+        if (self.deadline is None):
+            return 0.0
+        return max(0.0, self.deadline - time.monotonic())
+
+    def is_time_up(self) -> bool:
+        return self.running and self.get_remaining() <= 0
+
+    def select_cell(self, location: Tuple[int, int]) -> bool:
+        """If the given location is valid, add the cell to the current path and advance
+            the lexicon cursor by its letters (once the words are loaded). Returns whether the cell was added."""
+        if (not self.running or self.is_paused() or not self._check_location_valid(location)):
+            return False
+        row, col = location
+        letters = self.board[row][col]
+        self.curr_path.append(location)
+        self.curr_path_mask |= 1 << self._get_cell_index(location)
+        self.curr_word += letters
+        self._advance_cursor()
+        return True
+
+    def reset_word(self):
+        """Reset the current path."""
+        self.curr_path = []
+        self.curr_path_mask = 0
+        self.curr_nodes = []
+        self.curr_word = ""
+
+    def check_word(self) -> Optional[str]:
+        """Submit the current word, and reset the current path. The path is valid by
+            construction and the lexicon cursor is already on the word's node, so this is
+            a single lookup. Returns the word if it's a new word (and was scored), None otherwise."""
+        self._advance_cursor(wait=True)
+        word = self.curr_word if self.is_curr_word() else None
+        path = self.curr_path
+        self.reset_word()
+        if (self.is_time_up()):
+            #the UI may be late, the deadline isn't
+            self.finish_game()
+            return None
+        if (word is None or word in self.words_bank):
+            return None
+        self.words_bank.add(word, path)
+        self.curr_score += self.get_score_from_path(path)
+        self.solutions.remove(word)
+        return word
+
+    def is_curr_word(self) -> bool:
+        """Check if the current word is a full word, by the lexicon cursor (not yet, while the words load)."""
+        if (len(self.curr_path) == 0 or not self._advance_cursor()):
+            return False
+        node = self.curr_nodes[-1]
+        return node is not None and self.all_words.is_word(node)
+
+    def is_dead_prefix(self) -> bool:
+        """Check if no word starts with the current word (not known yet, while the words load)."""
+        return len(self.curr_path) > 0 and self._advance_cursor() and self.curr_nodes[-1] is None
+
+    def get_dead_end_cells(self) -> List[Tuple[int, int]]:
+        """Return the free neighbors of the path's last cell that can't continue the current word."""
+        if (len(self.curr_path) == 0 or not self._advance_cursor()):
+            return []
+        node = self.curr_nodes[-1]
+        dead_ends = []
+        for neighbor in self.neighbors[self._get_cell_index(self.curr_path[-1])]:
+            if (self.curr_path_mask >> neighbor & 1):
+                continue
+            row, col = divmod(neighbor, self.board_size)
+            if (node is None or self.all_words.step(node, self.board[row][col]) is None):
+                dead_ends.append((row, col))
+        return dead_ends
+
+    def _advance_cursor(self, wait: bool = False) -> bool:
+        """Step the lexicon cursor by the cells of the current path it didn't step yet. Words still
+            loading are only waited for if asked to. Returns whether the cursor is up to date."""
+        if (not wait and not self.words_ready()):
+            return False
+        for row, col in self.curr_path[len(self.curr_nodes):]:
+            node = self.curr_nodes[-1] if len(self.curr_nodes) > 0 else self.all_words.root
+            self.curr_nodes.append(None if node is None else self.all_words.step(node, self.board[row][col]))
+        return True
+
+    def get_score_from_path(self, path: Path) -> int:
+        """Score is calculated by path length squared."""
+        return len(path) ** 2
+
+    def get_hint_cells(self, max_score_paths: Optional[Iterable[Path]]) -> List[Tuple[int, int]]:
+        """According to the difficulty, return list of hint cells of the best max-score word
+            on the board not found yet. The board's max-score paths are given as they're solved
+            outside the engine, and are kept from the first hint on."""
+        if (not self.solutions_loaded and max_score_paths is not None):
+            for path in max_score_paths:
+                word = "".join(self.board[row][col] for row, col in path)
+                if (word not in self.words_bank):
+                    self.solutions.add(word, path)
+            self.solutions_loaded = True
+        best = self.solutions.pop_best()
+        if (best is None):
+            return []
+        return self._get_hint_cells_of_path(best[1])
+
+    def get_quick_hint_cells(self) -> List[Tuple[int, int]]:
+        """Return hint cells of the longest new word among the first words found
+            by a longest-first search, without waiting for the full solution."""
+        candidates = [(word, path) for word, path, _ in
+                      first_words(self.board, self.all_words, self.QUICK_HINT_WORDS)
+                      if word not in self.words_bank]
+        if (len(candidates) == 0):
+            return []
+        _, hint_path = max(candidates, key=lambda candidate: len(candidate[1]))
+        return self._get_hint_cells_of_path(hint_path)
+
+    def get_state(self) -> dict:
+        """Return the game's state, JSON-ready."""
+        return {"board": self.board, "running": self.running, "remaining": self.get_remaining(),
+                "paused": self.is_paused(), "path": self.curr_path, "word": self.curr_word, "is_word": self.is_curr_word(),
+                "dead_prefix": self.is_dead_prefix(), "score": self.curr_score,
+                "best_score": self.best_score, "words": list(self.words_bank)}
+
+    def _get_hint_cells_of_path(self, hint_path: Path) -> List[Tuple[int, int]]:
+        """Return the part of the hint path given by the difficulty."""
+        cutoff = 0
+        if (self.difficulty == Difficulty.EASY):
+            cutoff = len(hint_path) // 2
+        if (self.difficulty == Difficulty.MEDIUM):
+            cutoff = len(hint_path) // 3 or 1
+        return hint_path[0:cutoff]
+
+    def _check_location_valid(self, location: Tuple[int, int]) -> bool:
+        """Valid location = on the board AND (starting new path OR not in current path + valid move)."""
+        row, col = location
+        if (not (0 <= row < self.board_size and 0 <= col < self.board_size)):
+            return False
+        if (len(self.curr_path) == 0):
+            return True
+        cell_index = self._get_cell_index(location)
+        if (self.curr_path_mask >> cell_index & 1):
+            return False
+        return bool(self.neighbor_masks[self._get_cell_index(self.curr_path[-1])] >> cell_index & 1)
+
+    def _get_cell_index(self, location: Tuple[int, int]) -> int:
+        row, col = location
+        return row * self.board_size + col
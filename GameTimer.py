@@ -1,48 +1,97 @@
+import math
+import time
 import tkinter as tk
-from typing import Tuple
-from datetime import datetime, timedelta
+from typing import Optional, Tuple
 
 class GameTimer:
     """GameTimer - Represents a timer for usage inside Game.
-        Allows for initialization with duration, and controlling the timer from outside."""
+        Allows for initialization with duration, and controlling the timer from outside.
+        Remaining time is always computed from a deadline on the monotonic clock,
+        so late GUI updates never make the timer drift. The game owns the time: the timer
+        is started, paused and resumed with the game's deadline and remaining time."""
     def __init__(self, minutes: int, seconds: int, bg: str) -> None:
         self.timer_label: tk.Label
-        self.start_time = (minutes, seconds)
-        self.time: datetime
-        self.reset()
+        self.duration = minutes * 60 + seconds
+        #monotonic deadline while running, None while stopped or paused
+        self.deadline: Optional[float] = None
+        #remaining seconds while stopped or paused
+        self.remaining = float(self.duration)
+        self.shown_seconds = -1
         self.running = False
         self.bg = bg
 
-    def start(self):
-        """Start the timer"""
+    def start(self, deadline: Optional[float] = None):
+        """Start the timer, optionally counting down to a given time.monotonic() deadline."""
         if (not self.running):
             self.running = True
+            self.deadline = deadline if deadline is not None else time.monotonic() + self.remaining
 
     def stop(self):
         """Stop and reset the timer"""
         self.running = False
         self.reset()
 
+    def pause(self, remaining: float):
+        """Pause the running timer at the given remaining seconds - the game's, which owns the time."""
+        if (self.running):
+            self.remaining = remaining
+            self.deadline = None
+
+    def resume(self, deadline: float):
+        """Resume the paused timer, counting down to the game's new time.monotonic() deadline."""
+        if (self.running):
+            self.deadline = deadline
+
     def get_timer_state(self):
         """Returns current timer state - running or not."""
         return self.running
 
-    def update_time(self):
-        """Call to force update the timer and it's GUI representation."""
-        if (self.time.minute == 0 and self.time.second == 0):
+    def is_paused(self) -> bool:
+        return self.running and self.deadline is None
+
+    def get_deadline(self) -> Optional[float]:
+        """Returns the time.monotonic() time the timer ends at, None if it isn't counting down."""
+        return self.deadline
+
+    def get_remaining(self) -> float:
+        """Returns the remaining seconds."""
+        if (self.deadline is None):
+            return self.remaining
+        return max(0.0, self.deadline - time.monotonic())
+
+    def is_time_up(self) -> bool:
+        """Check if the running timer has reached its deadline."""
+        return self.running and self.get_remaining() <= 0
+
+    def update_time(self) -> int:
+        """Call to force update the timer and it's GUI representation.
+            Returns the milliseconds until the timer reaches its next whole second."""
+        remaining = self.get_remaining()
+        if (remaining <= 0):
             self.timer_label.config(text="Time's Up!")
+            self.shown_seconds = -1
             self.stop()
-        else:
-            self.time -= timedelta(seconds=1)
-            self.timer_label.config(text=self.time.strftime("%M:%S"))
+            return 0
+        self._show(math.ceil(remaining))
+        return math.ceil((remaining - (math.ceil(remaining) - 1)) * 1000)
 
     def reset(self):
         """Reset the timer to initialized time"""
-        minutes, seconds = self.start_time
-        self.time = datetime(year=1, month=1, day=1, minute=minutes, second=seconds)
+        self.deadline = None
+        self.remaining = float(self.duration)
 
     def gui(self, frame: tk.Frame, location: Tuple[int, int, int]):
         """Create the GUI representation of the timer."""
-        self.timer_label = tk.Label(frame, text=self.time.strftime("%M:%S"), font=("Arial", 24), bg=self.bg)
+        self.timer_label = tk.Label(frame, text=self._format(self.duration), font=("Arial", 24), bg=self.bg)
+        self.shown_seconds = self.duration
         row, col, colspan = location
         self.timer_label.grid(row=row, column=col, columnspan=colspan, pady=10)
+
+    def _show(self, seconds: int):
+        """Show the given remaining seconds, the label is only changed when they change."""
+        if (seconds != self.shown_seconds):
+            self.timer_label.config(text=self._format(seconds))
+            self.shown_seconds = seconds
+
+    def _format(self, seconds: int) -> str:
+        return "{:02d}:{:02d}".format(*divmod(seconds, 60))
@@ -0,0 +1,92 @@
+import logging
+import queue
+import threading
+from typing import Iterable, List, Optional, Tuple, Union
+from BackgroundLoader import BackgroundLoader, resolve
+from ex11_utils import max_score_paths
+from SolutionCache import SolutionCache
+from SolverStats import SolverStats
+
+logger = logging.getLogger(__name__)
+
+Path = List[Tuple[int, int]]
+
+class HintSolver:
+    """HintSolver - Solves boards for hints on a worker thread.
+        A new board starts a new job, cancelling the previous one. Finished results
+        come back through a thread-safe queue, so the GUI can poll for them
+        without ever blocking. Solutions are looked up in (and added to) the optional cache.
+        Words and cache may still be loading, the worker thread waits for them. A cache that
+        fails loading is dropped, a failed solve is reported by {poll} as the job's error."""
+    def __init__(self, words: Union[Iterable[str], BackgroundLoader[Iterable[str]]],
+                 cache: Union[None, SolutionCache, BackgroundLoader[SolutionCache]] = None):
+        self.words = words
+        self.cache = cache
+        #(job id, paths, stats, error) - a failed job has an error and no paths
+        self.results: "queue.Queue[Tuple[int, Optional[List[Path]], SolverStats, Optional[Exception]]]" = queue.Queue()
+        self.result: Optional[List[Path]] = None
+        self.error: Optional[Exception] = None
+        #stats of the solve that gave the current result
+        self.stats: Optional[SolverStats] = None
+        self._job_id = 0
+        self._stop: Optional[threading.Event] = None
+
+    def start(self, board: List[List[str]]):
+        """Start solving a new board, cancelling any running job."""
+        self.cancel()
+        self._job_id += 1
+        self._stop = threading.Event()
+        worker = threading.Thread(target=self._solve, args=(self._job_id, board, self._stop), daemon=True)
+        worker.start()
+
+    def cancel(self):
+        """Cancel the running job, its result (if any) is thrown away."""
+        if (self._stop is not None):
+            self._stop.set()
+        self._stop = None
+        self.result = None
+        self.error = None
+        self.stats = None
+
+    def poll(self) -> Optional[List[Path]]:
+        """Return the result of the current job if it's ready, None otherwise (also if it failed,
+            its error is then kept in {error})."""
+        while (self.result is None and self.error is None):
+            try:
+                job_id, paths, stats, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if (job_id == self._job_id and self._stop is not None):
+                self.result = paths
+                self.error = error
+                self.stats = stats
+        return self.result
+
+    def is_ready(self) -> bool:
+        return self.poll() is not None
+
+    def has_failed(self) -> bool:
+        self.poll()
+        return self.error is not None
+
+    def _solve(self, job_id: int, board: List[List[str]], stop: threading.Event):
+        """Worker thread - solve the board and post the result, unless cancelled."""
+        stats = SolverStats()
+        try:
+            paths = max_score_paths(board, resolve(self.words), stop, stats, self._get_cache())
+        except Exception as error:
+            if (not stop.is_set()):
+                self.results.put((job_id, None, stats, error))
+            return
+        if (not stop.is_set()):
+            self.results.put((job_id, paths, stats, None))
+
+    def _get_cache(self) -> Optional[SolutionCache]:
+        """Return the cache, waiting for it to load. A cache failing to load is dropped -
+            boards are then solved without it."""
+        try:
+            return resolve(self.cache)
+        except Exception as error:
+            logger.warning("hint cache dropped, it failed loading: %s", error)
+            self.cache = None
+            return None
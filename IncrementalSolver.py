@@ -0,0 +1,148 @@
+from typing import Dict, Iterable, List, Set, Tuple
+from weakref import WeakKeyDictionary
+from ex11_utils import get_neighbors, Node, PrefixIndex, PREFIX_INDEX_TYPES, solve_board
+from Trie import Trie
+
+Board = List[List[str]]
+Path = List[Tuple[int, int]]
+#a cell (i, j) is encoded as the flat integer i * cols + j, like inside the solver
+CellPath = Tuple[int, ...]
+#the bit of every non-ASCII letter - a lexicon's edges spell those as UTF-8 bytes, a trie's as letters
+NON_ASCII = 128
+
+class IncrementalSolver:
+    """IncrementalSolver - The solution of a board (every path of every word), kept up to
+        date as single cells of the board change - a shaken die, an edited cell, a
+        hill-climbing step. The board is solved in full once; replacing a cell then only
+        drops the paths through that cell and searches again the paths through it, which
+        are pruned early: a path that didn't reach the cell yet is dropped once the cell is
+        farther away (Chebyshev distance, in moves) than the longest word it can still spell,
+        or once no word it can still spell has the cell's first letter.
+        The solution always matches a full solve of the current board."""
+    def __init__(self, board: Board, words: Iterable[str]):
+        #the prefix index must hold all the words - later cells may have any letters
+        self.words: PrefixIndex = words if isinstance(words, PREFIX_INDEX_TYPES) else Trie(words)
+        self.board = [list(row) for row in board]
+        self.rows, self.cols = len(board), len(board[0])
+        self.letters = [cell for row in board for cell in row]
+        self.neighbors = get_neighbors(self.rows, self.cols)
+        self.letters_below = letters_below(self.words)
+        self.paths: Dict[str, List[CellPath]] = {word: list(solution.paths or ())
+                                                 for word, solution in solve_board(board, self.words).items()}
+        #words having a path through each cell
+        self.cell_words: List[Set[str]] = [set() for _ in self.letters]
+        for word, word_paths in self.paths.items():
+            for path in word_paths:
+                for cell in path:
+                    self.cell_words[cell].add(word)
+
+    def replace_cell(self, location: Tuple[int, int], letters: str):
+        """Put the given letters in the cell at the given location, and update the solution."""
+        row, col = location
+        target = row * self.cols + col
+        self.board[row][col] = letters
+        self.letters[target] = letters
+        for word in self.cell_words[target]:
+            self._drop_paths_through(word, target)
+        self.cell_words[target] = set()
+        self._search_through(target)
+
+    def get_words(self) -> Set[str]:
+        return set(self.paths)
+
+    def get_paths(self, word: str) -> List[Path]:
+        """Return all the paths of the word on the board, none if it's not on the board."""
+        return [self._decode_path(path) for path in self.paths.get(word, ())]
+
+    def max_score_paths(self) -> List[Path]:
+        """Return a longest path of every word, longest first (words alphabetically among equals)."""
+        return [self._decode_path(max(self.paths[word], key=len))
+                for word in sorted(self.paths, key=lambda word: (-len(max(self.paths[word], key=len)), word))]
+
+    def get_max_score(self) -> int:
+        """Return the total score of the board - every word's longest path length squared."""
+        return sum(max(len(path) for path in word_paths) ** 2 for word_paths in self.paths.values())
+
+    def _drop_paths_through(self, word: str, target: int):
+        """Drop the paths of the word through the target cell, and the word if no path is left."""
+        kept_paths, dropped_cells = [], set()
+        for path in self.paths[word]:
+            if (target in path):
+                dropped_cells.update(path)
+            else:
+                kept_paths.append(path)
+        kept_cells = {cell for path in kept_paths for cell in path}
+        for cell in dropped_cells - kept_cells:
+            if (cell != target):
+                self.cell_words[cell].discard(word)
+        if (len(kept_paths) > 0):
+            self.paths[word] = kept_paths
+        else:
+            del self.paths[word]
+
+    def _search_through(self, target: int):
+        """Search (and add) the paths of every word through the target cell."""
+        target_row, target_col = divmod(target, self.cols)
+        #moves needed from every cell to reach the target
+        distances = [max(abs(cell // self.cols - target_row), abs(cell % self.cols - target_col))
+                     for cell in range(len(self.letters))]
+        target_bit = 1 << min(ord(self.letters[target][0]), NON_ASCII)
+        path: List[int] = []
+
+        def can_reach_target(cell: int, node: Node) -> bool:
+            #every move spells at least a letter - the target must be reachable by the longest word
+            # left, and some word left must have the target's letters
+            return (distances[cell] <= self.words.height(node) and
+                    bool(self.letters_below.get(node, 0) & target_bit))
+
+        def extend(cell: int, node: Node, visited: int, through: bool):
+            path.append(cell)
+            if (through and self.words.is_word(node)):
+                self._add_path("".join([self.letters[path_cell] for path_cell in path]), tuple(path))
+            for neighbor in self.neighbors[cell]:
+                if (visited >> neighbor & 1):
+                    continue
+                child = self.words.step(node, self.letters[neighbor])
+                if (child is None):
+                    continue
+                if (through or neighbor == target or can_reach_target(neighbor, child)):
+                    extend(neighbor, child, visited | 1 << neighbor, through or neighbor == target)
+            path.pop()
+
+        for start in range(len(self.letters)):
+            node = self.words.step(self.words.root, self.letters[start])
+            if (node is not None and (start == target or can_reach_target(start, node))):
+                extend(start, node, 1 << start, start == target)
+
+    def _add_path(self, word: str, path: CellPath):
+        self.paths.setdefault(word, []).append(path)
+        for cell in path:
+            self.cell_words[cell].add(word)
+
+    def _decode_path(self, path: CellPath) -> Path:
+        return [divmod(cell, self.cols) for cell in path]
+
+_letters_below: "WeakKeyDictionary[PrefixIndex, Dict[Node, int]]" = WeakKeyDictionary()
+
+def letters_below(words: PrefixIndex) -> Dict[Node, int]:
+    """Return the letters spelled below every node of the prefix index (by any word continuing
+        its prefix), as a bitmask of the letters' codes (one shared bit for non-ASCII letters). Built once per prefix index, children first."""
+    masks = _letters_below.get(words)
+    if (masks is not None):
+        return masks
+    masks = {}
+    stack = [(words.root, False)]
+    while (len(stack) > 0):
+        node, children_done = stack.pop()
+        if (node in masks):
+            continue
+        if (children_done):
+            mask = 0
+            for char, child in words.edges(node):
+                mask |= masks[child] | 1 << min(ord(char), NON_ASCII)
+            masks[node] = mask
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for _, child in words.edges(node) if child not in masks)
+    _letters_below[words] = masks
+    return masks
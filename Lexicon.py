@@ -0,0 +1,246 @@
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+from Trie import Trie, TrieNode
+
+#file layout: header, nodes table (first edge, height << 8 | edge count << 1 | is word),
+# edge labels (one byte each, sorted per node) and edge targets (node index).
+#words are stored as their UTF-8 bytes, so a label is a letter for ASCII words, and a non-ASCII
+# letter takes a few edges (and counts as a few letters in a node's height)
+#tables are written in the machine's native byte order
+MAGIC = b"BGLX"
+VERSION = 2
+HEADER = struct.Struct("=4sIIII")
+NODE_FIELDS = 2
+EDGES_MASK = 0x7F
+
+class Lexicon:
+    """Lexicon - A compiled, read-only prefix index of words, opened with mmap.
+        The lexicon is a minimized prefix tree (DAWG) serialized to a flat file by
+        {compile_lexicon}. It is walked node-by-node just like a {Trie}, but nodes are
+        plain integers into the mapped file, so no word is ever materialized.
+        A lexicon can also be walked in place in any other buffer holding a compiled
+        lexicon, such as a shared memory block ({from_buffer})."""
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as lexicon_file:
+            self._mmap: Optional[mmap.mmap] = mmap.mmap(lexicon_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._owner: Any = None
+        self._load(self._mmap)
+
+    @classmethod
+    def from_buffer(cls, buffer: Any, name: str, owner: Any = None) -> "Lexicon":
+        """Open a compiled lexicon held by the given buffer, without copying it.
+            The optional owner of the buffer is kept alive, and closed with the lexicon."""
+        lexicon = cls.__new__(cls)
+        lexicon.path = name
+        lexicon._mmap = None
+        lexicon._owner = owner
+        lexicon._load(buffer)
+        return lexicon
+
+    def _load(self, buffer: Any):
+        """Locate the tables inside the buffer."""
+        magic, version, node_count, edge_count, word_count = HEADER.unpack_from(buffer, 0)
+        if (magic != MAGIC or version != VERSION):
+            raise ValueError("Not a compiled lexicon: " + self.path)
+        self.size = word_count
+        nodes_start = HEADER.size
+        labels_start = nodes_start + node_count * NODE_FIELDS * 4
+        targets_start = labels_start + _align(edge_count)
+        self._buffer = memoryview(buffer)[:targets_start + edge_count * 4]
+        self._nodes = self._buffer[nodes_start:labels_start].cast("I")
+        self._targets = self._buffer[targets_start:targets_start + edge_count * 4].cast("I")
+        self._labels_start = labels_start
+        self.root = 0
+
+    def step(self, node: int, letters: str) -> Optional[int]:
+        """Walk from a given node with the given letters (a cell may hold more than one letter).
+            Returns the node of the extended prefix, None if no word starts with it."""
+        nodes = self._nodes
+        for char in letters:
+            first = self._labels_start + nodes[node * NODE_FIELDS]
+            count = nodes[node * NODE_FIELDS + 1] >> 1 & EDGES_MASK
+            label = _LABELS.get(char)
+            if (label is None):
+                node = self._step_bytes(node, char.encode("utf-8"))
+                if (node is None):
+                    return None
+                continue
+            found = label.search(self._buffer, first, first + count)
+            if (found is None):
+                return None
+            node = self._targets[found.start() - self._labels_start]
+        return node
+
+    def _step_bytes(self, node: int, encoded: bytes) -> Optional[int]:
+        """Walk from a given node with the UTF-8 bytes of a non-ASCII letter."""
+        nodes = self._nodes
+        for code in encoded:
+            first = self._labels_start + nodes[node * NODE_FIELDS]
+            count = nodes[node * NODE_FIELDS + 1] >> 1 & EDGES_MASK
+            found = _BYTE_LABELS[code].search(self._buffer, first, first + count)
+            if (found is None):
+                return None
+            node = self._targets[found.start() - self._labels_start]
+        return node
+
+    def is_word(self, node: int) -> bool:
+        """Check if the prefix leading to the given node is a full word."""
+        return bool(self._nodes[node * NODE_FIELDS + 1] & 1)
+
+    def height(self, node: int) -> int:
+        """Return the number of letters of the longest word continuing the given node's prefix
+            (a non-ASCII letter counts as its UTF-8 bytes, so it's an upper bound)."""
+        return self._nodes[node * NODE_FIELDS + 1] >> 8
+
+    def edges(self, node: int) -> Iterator[Tuple[str, int]]:
+        """Iterate the (letter, child node) edges of the given node. Labels are UTF-8 bytes:
+            ASCII letters are themselves, a non-ASCII letter is a few edges of chars above 127."""
+        first = self._nodes[node * NODE_FIELDS]
+        count = self._nodes[node * NODE_FIELDS + 1] >> 1 & EDGES_MASK
+        for edge in range(first, first + count):
+            yield chr(self._buffer[self._labels_start + edge]), self._targets[edge]
+
+    def has_prefix(self, prefix: str) -> bool:
+        """Check if any word in the lexicon starts with the given prefix."""
+        return self.step(self.root, prefix) is not None
+
+    def fingerprint(self) -> str:
+        """Return a checksum of the compiled lexicon, naming its exact words."""
+        return "{:08x}-{}".format(zlib.crc32(self._buffer), self.size)
+
+    def close(self):
+        """Release the mapped file, or the buffer (and close its owner)."""
+        self._nodes.release()
+        self._targets.release()
+        self._buffer.release()
+        if (self._mmap is not None):
+            self._mmap.close()
+        if (self._owner is not None):
+            self._owner.close()
+
+    def __contains__(self, word: object) -> bool:
+        if (not isinstance(word, str)):
+            return False
+        node = self.step(self.root, word)
+        return node is not None and self.is_word(node)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[str]:
+        stack = [(self.root, "")]
+        while stack:
+            node, prefix = stack.pop()
+            if (self.is_word(node)):
+                yield prefix.encode("latin-1").decode("utf-8")
+            first = self._nodes[node * NODE_FIELDS]
+            count = self._nodes[node * NODE_FIELDS + 1] >> 1 & EDGES_MASK
+            for edge in range(first + count - 1, first - 1, -1):
+                label = chr(self._buffer[self._labels_start + edge])
+                stack.append((self._targets[edge], prefix + label))
+
+#edge labels are found with a search in the node's labels, right in the buffer
+_BYTE_LABELS: List[Pattern[bytes]] = [re.compile(re.escape(bytes([code]))) for code in range(256)]
+_LABELS: Dict[str, Pattern[bytes]] = {chr(code): _BYTE_LABELS[code] for code in range(128)}
+
+def _align(size: int) -> int:
+    """Round a section size up to a 4 bytes boundary."""
+    return (size + 3) & ~3
+
+def compile_lexicon(words: Iterable[str], lexicon_path: str) -> int:
+    """Compile the given words into a lexicon file. Equal suffix trees are merged
+        (a DAWG), so the file stays small. Returns the number of words compiled."""
+    words_count, data = lexicon_bytes(words)
+    tmp_path = lexicon_path + ".tmp"
+    with open(tmp_path, "wb") as lexicon_file:
+        lexicon_file.write(data)
+    os.replace(tmp_path, lexicon_path)
+    return words_count
+
+def lexicon_bytes(words: Iterable[str]) -> Tuple[int, bytes]:
+    """Compile the given words into a lexicon, returns the number of words compiled
+        and the compiled lexicon."""
+    #one char per UTF-8 byte - ASCII words are unchanged
+    trie = Trie(word.encode("utf-8").decode("latin-1") for word in words)
+    #minimize - register every distinct sub-tree once, children first
+    registry: Dict[Tuple[bool, Tuple[Tuple[str, int], ...]], int] = {}
+    edges_of: List[Tuple[Tuple[str, int], ...]] = []
+    is_word_of: List[bool] = []
+    height_of: List[int] = []
+
+    def register(node: TrieNode) -> int:
+        edges = tuple((char, register(child)) for char, child in sorted(node.children.items()))
+        key = (node.is_word, edges)
+        if (key not in registry):
+            registry[key] = len(edges_of)
+            edges_of.append(edges)
+            is_word_of.append(node.is_word)
+            height_of.append(node.height)
+        return registry[key]
+
+    old_root = register(trie.root)
+    #renumber so the root is node 0, then lay out the edges contiguously per node
+    order = [old_root] + [node for node in range(len(edges_of)) if node != old_root]
+    new_index = {old: new for new, old in enumerate(order)}
+    nodes = array("I")
+    labels = bytearray()
+    targets = array("I")
+    for old in order:
+        edges = edges_of[old]
+        if (len(edges) > EDGES_MASK):
+            raise ValueError("Too many distinct letters after a prefix: {}".format(len(edges)))
+        nodes.append(len(targets))
+        nodes.append((height_of[old] << 8) | (len(edges) << 1) | int(is_word_of[old]))
+        for char, child in edges:
+            labels += char.encode("latin-1")
+            targets.append(new_index[child])
+    labels += bytes(_align(len(labels)) - len(labels))
+    header = HEADER.pack(MAGIC, VERSION, len(order), len(targets), len(trie))
+    return len(trie), b"".join((header, nodes.tobytes(), bytes(labels), targets.tobytes()))
+
+def load_lexicon(lexicon_path: str, words_path: str, timings: Optional[Dict[str, float]] = None,
+                 words_filter: Optional[Callable[[Iterable[str]], Iterable[str]]] = None) -> Lexicon:
+    """Open the compiled lexicon, compiling it from the words file first
+        if it is missing, older than the words file or of an older format.
+        The optional words filter picks the words compiled out of the file's words.
+        The seconds spent compiling ("index_build", 0 if not needed) and opening
+        ("dictionary_load") are set in the optional timings."""
+    if (timings is not None):
+        timings["index_build"] = 0.0
+    if (os.path.exists(lexicon_path) and
+            os.path.getmtime(lexicon_path) >= os.path.getmtime(words_path)):
+        try:
+            return _open_lexicon(lexicon_path, timings)
+        except ValueError:
+            pass
+    start_time = perf_counter()
+    with open(words_path) as words_file:
+        words: Iterable[str] = words_file.read().splitlines()
+    compile_lexicon(words_filter(words) if words_filter is not None else words, lexicon_path)
+    if (timings is not None):
+        timings["index_build"] = perf_counter() - start_time
+    return _open_lexicon(lexicon_path, timings)
+
+def _open_lexicon(lexicon_path: str, timings: Optional[Dict[str, float]]) -> Lexicon:
+    start_time = perf_counter()
+    lexicon = Lexicon(lexicon_path)
+    if (timings is not None):
+        timings["dictionary_load"] = perf_counter() - start_time
+    return lexicon
+
+
+if __name__ == "__main__":
+    if (len(sys.argv) != 3):
+        print("Usage: python Lexicon.py <words.txt> <output.lex>")
+        sys.exit(1)
+    with open(sys.argv[1]) as words_file:
+        words_count = compile_lexicon(words_file.read().splitlines(), sys.argv[2])
+    print("Compiled", words_count, "words to", sys.argv[2])
@@ -0,0 +1,102 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, Iterable, Optional, Sequence
+from boggle_board_randomizer import BOARD_SIZE
+from dice_lexicon import DICTIONARY_PATH, LEXICON_PATH, Dice, dice_lexicon_path, load_dice_lexicon
+from Lexicon import Lexicon, lexicon_bytes, load_lexicon
+
+class SharedLexicons:
+    """SharedLexicons - Compiled lexicons published in shared memory, side by side by name
+        (a dictionary, a language...). The publishing process copies every lexicon once into
+        its own shared memory block; worker processes attach the blocks by their names
+        ({attach_lexicon}) and walk them in place, so no process loads or copies the words.
+        The publisher owns the blocks - closing it removes them."""
+    def __init__(self):
+        self.blocks: Dict[str, SharedMemory] = {}
+
+    def publish(self, name: str, lexicon_path: str) -> str:
+        """Publish a compiled lexicon file under the given name. Returns its block name."""
+        with open(lexicon_path, "rb") as lexicon_file:
+            return self._publish(name, lexicon_file.read())
+
+    def publish_words(self, name: str, words: Iterable[str]) -> str:
+        """Compile the given words and publish them under the given name. Returns its block name."""
+        _, data = lexicon_bytes(words)
+        return self._publish(name, data)
+
+    def publish_compiled(self, name: str, lexicon_path: str = LEXICON_PATH, words_path: str = DICTIONARY_PATH,
+                         dice_list: Optional[Dice] = None, board_size: int = BOARD_SIZE) -> str:
+        """Compile the words file into the lexicon file once (only if it's stale), and publish it
+            under the given name. With a dice list, only the words these dice can spell on boards
+            of the given size are published ({load_dice_lexicon}). Returns its block name."""
+        if (dice_list is None):
+            load_lexicon(lexicon_path, words_path).close()
+        else:
+            load_dice_lexicon(lexicon_path, words_path, dice_list, board_size).close()
+            lexicon_path = dice_lexicon_path(lexicon_path, dice_list, board_size)
+        return self.publish(name, lexicon_path)
+
+    def get_block_names(self) -> Dict[str, str]:
+        """Return the block name of every published lexicon - pass them to the workers."""
+        return {name: block.name for name, block in self.blocks.items()}
+
+    def get(self, name: str) -> Lexicon:
+        """Open a published lexicon in this process (it's closed by the caller)."""
+        return attach_lexicon(self.blocks[name].name)
+
+    def executor(self, workers: int, initializer: Optional[Callable[..., None]] = None,
+                 initargs: Sequence[object] = ()) -> ProcessPoolExecutor:
+        """Start a pool of worker processes attaching every published lexicon ({worker_lexicon}),
+            then running the optional initializer of their own."""
+        return ProcessPoolExecutor(workers, initializer=init_worker,
+                                   initargs=(self.get_block_names(), initializer, tuple(initargs)))
+
+    def close(self):
+        """Remove all the published blocks. Lexicons attached to them stay usable until
+            closed, new ones can't attach anymore."""
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+    def _publish(self, name: str, data: bytes) -> str:
+        if (name in self.blocks):
+            raise ValueError("A lexicon is already published as " + name)
+        block = SharedMemory(create=True, size=len(data))
+        block.buf[:len(data)] = data
+        self.blocks[name] = block
+        return block.name
+
+    def __enter__(self) -> "SharedLexicons":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def attach_lexicon(block_name: str) -> Lexicon:
+    """Open the lexicon published in the shared memory block of the given name, zero-copy."""
+    block = SharedMemory(block_name)
+    return Lexicon.from_buffer(block.buf, "shm:" + block_name, owner=block)
+
+def attach_lexicons(block_names: Dict[str, str]) -> Dict[str, Lexicon]:
+    """Open all the published lexicons, by name, given their block names."""
+    return {name: attach_lexicon(block_name) for name, block_name in block_names.items()}
+
+#attached once per worker process by the pool initializer, by lexicon name
+_worker_lexicons: Dict[str, Lexicon] = {}
+
+def init_worker(block_names: Dict[str, str], initializer: Optional[Callable[..., None]] = None,
+                initargs: Sequence[object] = ()):
+    """Pool initializer - attach the published lexicons, then run the worker's own initializer."""
+    use_worker_lexicons(attach_lexicons(block_names))
+    if (initializer is not None):
+        initializer(*initargs)
+
+def use_worker_lexicons(lexicons: Dict[str, Lexicon]):
+    """Make the given lexicons this process' worker lexicons - for tasks run without a pool."""
+    global _worker_lexicons
+    _worker_lexicons = lexicons
+
+def worker_lexicon(name: str) -> Lexicon:
+    """Return the lexicon published under the given name, attached by this worker process."""
+    return _worker_lexicons[name]
@@ -0,0 +1,77 @@
+from typing import Any, Iterable, List, Optional
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+#a signature packs the count of every letter into one integer - a field of FIELD_BITS
+# per letter, whose top bit is a guard bit. Comparing all the letters of a word against
+# a board is then a single subtraction: a field's guard bit survives only if the board
+# has at least as many of that letter as the word.
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+FIELD_BITS = 6
+MAX_COUNT = (1 << (FIELD_BITS - 1)) - 1
+#letters outside the alphabet share the last field
+OTHER_FIELD = len(ALPHABET)
+GUARDS = sum(1 << (field * FIELD_BITS + FIELD_BITS - 1) for field in range(OTHER_FIELD + 1))
+_FIELDS = {char: field for field, char in enumerate(ALPHABET)}
+#with NumPy, signatures are split into 64 bits lanes of whole fields, compared all at once
+LANE_FIELDS = 64 // FIELD_BITS
+LANES = -(-(OTHER_FIELD + 1) // LANE_FIELDS)
+LANE_MASK = (1 << (LANE_FIELDS * FIELD_BITS)) - 1
+
+def letters_signature(letters: Iterable[str]) -> int:
+    """Return the signature of the letter counts of the given letters."""
+    counts = [0] * (OTHER_FIELD + 1)
+    for char in letters:
+        counts[_FIELDS.get(char, OTHER_FIELD)] += 1
+    signature = 0
+    for field, count in enumerate(counts):
+        if (count > 0):
+            signature |= min(count, MAX_COUNT) << (field * FIELD_BITS)
+    return signature
+
+def board_signature(board: List[List[str]]) -> int:
+    """Return the signature of the letters on a board. A multi-letter cell (like QU)
+        adds each of its letters."""
+    return letters_signature(char for row in board for cell in row for char in cell)
+
+def signature_fits(board_sig: int, word_sig: int) -> bool:
+    """Check if every letter count of the word fits in the board's letter counts."""
+    return ((board_sig | GUARDS) - word_sig) & GUARDS == GUARDS
+
+def _split_lanes(signature: int) -> List[int]:
+    return [(signature >> (lane * LANE_FIELDS * FIELD_BITS)) & LANE_MASK for lane in range(LANES)]
+
+class SignatureIndex:
+    """SignatureIndex - Letter-count signatures of a words dictionary.
+        Every word's signature is computed once. Filtering the dictionary for a board
+        is then one comparison per word against the board's letter counts, giving the
+        candidate words that may appear on the board. If NumPy is installed, the signatures
+        are also kept in an array and all the words are compared in one vectorized step."""
+    def __init__(self, words: Iterable[str]):
+        self.words: List[str] = list(words)
+        self.signatures: List[int] = [letters_signature(word) for word in self.words]
+        #one array per lane, of every word's fields in that lane
+        self._lanes: Optional[List[Any]] = None
+        if (np is not None):
+            self._lanes = [np.fromiter(((word_sig >> shift) & LANE_MASK for word_sig in self.signatures),
+                                       dtype=np.uint64, count=len(self.signatures))
+                           for shift in range(0, LANES * LANE_FIELDS * FIELD_BITS, LANE_FIELDS * FIELD_BITS)]
+
+    def candidates(self, board: List[List[str]]) -> List[str]:
+        """Return the words whose letters all fit in the board's letters."""
+        board_sig = board_signature(board) | GUARDS
+        if (self._lanes is not None):
+            fits = np.ones(len(self.words), dtype=bool)
+            for lane, board_lane, guards in zip(self._lanes, _split_lanes(board_sig), _split_lanes(GUARDS)):
+                fits &= (np.uint64(board_lane) - lane) & np.uint64(guards) == np.uint64(guards)
+            return [self.words[word_i] for word_i in np.flatnonzero(fits)]
+        return [word for word, word_sig in zip(self.words, self.signatures)
+                if (board_sig - word_sig) & GUARDS == GUARDS]
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __iter__(self):
+        return iter(self.words)
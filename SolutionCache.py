@@ -0,0 +1,158 @@
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+Board = List[List[str]]
+Path = List[Tuple[int, int]]
+#a transform maps every flat cell index of the board to its new flat index
+Transform = Tuple[int, ...]
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = 1024
+CELLS_SEPARATOR = "|"
+
+class SolutionCache:
+    """SolutionCache - Cache of board solutions (max-score paths).
+        Boards are keyed by their canonical form - the smallest of the board's 8 rotations
+        and mirrors - so a rotated or mirrored board is a hit too, its paths are mapped
+        back through the transform. Recently used solutions are kept in memory (LRU),
+        and an optional SQLite file keeps all of them, shared across processes.
+        A cache holds the solutions of one words dictionary, named by dictionary_id.
+        The file is optional - if it can't be opened, read or written (a read-only directory,
+        a locked database), the cache goes on in memory only."""
+    def __init__(self, dictionary_id: str, path: Optional[str] = None, max_entries: int = MAX_ENTRIES):
+        self.dictionary_id = dictionary_id
+        self.max_entries = max_entries
+        self.memory: "OrderedDict[str, List[List[int]]]" = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if (path is not None):
+            try:
+                self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS solutions "
+                                 "(dictionary TEXT, board TEXT, paths TEXT, PRIMARY KEY (dictionary, board))")
+                self._db.commit()
+            except sqlite3.Error as error:
+                self._drop_db(error)
+
+    def get(self, board: Board) -> Optional[List[Path]]:
+        """Return the cached max-score paths of the board, None if it wasn't solved yet."""
+        key, transform = canonical_board(board)
+        with self._lock:
+            paths = self.memory.get(key)
+            if (paths is not None):
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+            else:
+                paths = self._disk_get(key)
+                if (paths is None):
+                    self.misses += 1
+                    return None
+                self.disk_hits += 1
+                self._memory_put(key, paths)
+        inverse = _inverse(transform)
+        cols = len(board[0])
+        return [[divmod(inverse[cell], cols) for cell in path] for path in paths]
+
+    def put(self, board: Board, paths: List[Path]):
+        """Cache the max-score paths of the board."""
+        key, transform = canonical_board(board)
+        cols = len(board[0])
+        canonical_paths = [[transform[row * cols + col] for row, col in path] for path in paths]
+        with self._lock:
+            self._memory_put(key, canonical_paths)
+            if (self._db is not None):
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)",
+                                     (self.dictionary_id, key, json.dumps(canonical_paths)))
+                    self._db.commit()
+                except sqlite3.Error as error:
+                    self._drop_db(error)
+
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def get_stats(self) -> dict:
+        return {"memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "hit_rate": self.hit_rate(), "memory_entries": len(self.memory), "on_disk": self._db is not None}
+
+    def close(self):
+        if (self._db is not None):
+            self._db.close()
+            self._db = None
+
+    def _memory_put(self, key: str, paths: List[List[int]]):
+        self.memory[key] = paths
+        self.memory.move_to_end(key)
+        while (len(self.memory) > self.max_entries):
+            self.memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[List[List[int]]]:
+        if (self._db is None):
+            return None
+        try:
+            row = self._db.execute("SELECT paths FROM solutions WHERE dictionary = ? AND board = ?",
+                                   (self.dictionary_id, key)).fetchone()
+        except sqlite3.Error as error:
+            self._drop_db(error)
+            return None
+        return json.loads(row[0]) if row is not None else None
+
+    def _drop_db(self, error: sqlite3.Error):
+        """Go on in memory only, the file failed."""
+        logger.warning("solutions cache file dropped, keeping solutions in memory only: %s", error)
+        if (self._db is not None):
+            try:
+                self._db.close()
+            except sqlite3.Error:
+                pass
+        self._db = None
+
+@lru_cache(maxsize=None)
+def board_transforms(rows: int, cols: int) -> Tuple[Transform, ...]:
+    """Return the transforms of a board's cells - the 8 rotations and mirrors of a square
+        board. Other boards are only keyed as they are. Built once per board size."""
+    if (rows != cols):
+        return (tuple(range(rows * cols)),)
+    last = rows - 1
+    moves = [lambda r, c: (r, c), lambda r, c: (c, last - r), lambda r, c: (last - r, last - c),
+             lambda r, c: (last - c, r), lambda r, c: (r, last - c), lambda r, c: (c, r),
+             lambda r, c: (last - r, c), lambda r, c: (last - c, last - r)]
+    transforms = []
+    for move in moves:
+        transform = []
+        for cell in range(rows * cols):
+            new_row, new_col = move(*divmod(cell, cols))
+            transform.append(new_row * cols + new_col)
+        transforms.append(tuple(transform))
+    return tuple(transforms)
+
+def canonical_board(board: Board) -> Tuple[str, Transform]:
+    """Return the canonical key of the board - the smallest of its transformed forms -
+        and the transform that gives it."""
+    cells = [cell for row in board for cell in row]
+    best: Optional[Tuple[str, Transform]] = None
+    for transform in board_transforms(len(board), len(board[0])):
+        moved = [""] * len(cells)
+        for cell, new_cell in enumerate(transform):
+            moved[new_cell] = cells[cell]
+        key = "{}x{}:{}".format(len(board), len(board[0]), CELLS_SEPARATOR.join(moved))
+        if (best is None or key < best[0]):
+            best = (key, transform)
+    assert best is not None
+    return best
+
+def _inverse(transform: Transform) -> Transform:
+    inverse = [0] * len(transform)
+    for cell, new_cell in enumerate(transform):
+        inverse[new_cell] = cell
+    return tuple(inverse)
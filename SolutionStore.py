@@ -0,0 +1,100 @@
+import heapq
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+Path = List[Tuple[int, int]]
+
+class SolutionStore:
+    """SolutionStore - Words and their paths on a board, indexed by word and by encoded path.
+        A path is kept as the bytes of its flat cell indices, so lookups and removals by word
+        or by path are a dict access, not a scan. Words are also kept in a priority heap by
+        score (cells squared), and {pop_best} takes the best word that wasn't popped yet;
+        entries of removed (or replaced) words are skipped when they reach the heap's top."""
+    def __init__(self, board_size: int):
+        self.board_size = board_size
+        self._paths: Dict[str, bytes] = {}
+        self._words: Dict[bytes, str] = {}
+        #(-score, word, entry id) of the words not popped yet, stale entries included until they're reached
+        self._heap: List[Tuple[int, str, int]] = []
+        #the entry id of every word's live heap entry - popped, removed and replaced entries have none
+        self._queued: Dict[str, int] = {}
+        self._next_entry = 0
+
+    def add(self, word: str, path: Path):
+        """Add the word with its path, replacing its previous path if it's already in the store."""
+        self.remove(word)
+        encoded = self.encode_path(path)
+        #a path spells a single word
+        if (encoded in self._words):
+            self.remove(self._words[encoded])
+        self._paths[word] = encoded
+        self._words[encoded] = word
+        self._push(word, encoded)
+
+    def add_all(self, words_paths: Iterable[Tuple[str, Path]]):
+        for word, path in words_paths:
+            self.add(word, path)
+
+    def get_path(self, word: str) -> Optional[Path]:
+        encoded = self._paths.get(word)
+        return None if encoded is None else self.decode_path(encoded)
+
+    def get_word(self, path: Path) -> Optional[str]:
+        """Return the word kept with the given path, None if there's none."""
+        return self._words.get(self.encode_path(path))
+
+    def remove(self, word: str) -> bool:
+        """Remove the word, returns whether it was in the store."""
+        encoded = self._paths.pop(word, None)
+        if (encoded is None):
+            return False
+        del self._words[encoded]
+        self._queued.pop(word, None)
+        return True
+
+    def remove_path(self, path: Path) -> bool:
+        """Remove the word kept with the given path, returns whether there was one."""
+        word = self.get_word(path)
+        return word is not None and self.remove(word)
+
+    def pop_best(self) -> Optional[Tuple[str, Path]]:
+        """Return the best scoring word (and its path) that wasn't popped yet, it stays in the store.
+            Once all were popped, they're all popped again, best first. None if the store is empty."""
+        for _ in range(2):
+            while (len(self._heap) > 0):
+                _, word, entry = heapq.heappop(self._heap)
+                if (self._queued.get(word) == entry):
+                    del self._queued[word]
+                    return word, self.decode_path(self._paths[word])
+            #only stale entries were left - all the words were popped, start over
+            for word, encoded in self._paths.items():
+                self._push(word, encoded)
+        return None
+
+    def clear(self):
+        self._paths = {}
+        self._words = {}
+        self._heap = []
+        self._queued = {}
+
+    def _push(self, word: str, encoded: bytes):
+        """Queue a heap entry of the word, replacing its previous entry (if any)."""
+        self._queued[word] = self._next_entry
+        heapq.heappush(self._heap, (-(len(encoded) // 2) ** 2, word, self._next_entry))
+        self._next_entry += 1
+
+    def encode_path(self, path: Path) -> bytes:
+        return array("H", [row * self.board_size + col for row, col in path]).tobytes()
+
+    def decode_path(self, encoded: bytes) -> Path:
+        return [divmod(cell, self.board_size) for cell in array("H", encoded)]
+
+    def __contains__(self, word: object) -> bool:
+        return word in self._paths
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate the words, in the order they were added."""
+        return iter(self._paths)
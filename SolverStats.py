@@ -0,0 +1,46 @@
+from typing import Dict, Tuple
+
+class SolverStats:
+    """SolverStats - Counters and timings of the work done by the ex11_utils solvers.
+        Pass an instance to a solver function to have it traced, the counters add up
+        over all the calls it's passed to. Without one, the solvers skip all the timing.
+        The on_* methods are the profiling hooks - override them to trace more."""
+    def __init__(self):
+        self.calls = 0
+        #board search nodes (cell + prefix) expanded, and moves pruned by a dead prefix
+        self.nodes = 0
+        self.pruned = 0
+        #seconds spent preparing the words (prefix index, filtering) and searching the board
+        self.prefix_time = 0.0
+        self.search_time = 0.0
+        #seconds spent searching from each start cell
+        self.start_cell_times: Dict[Tuple[int, int], float] = {}
+        #seconds spent building each result view over the board search (a single search
+        # replaced the per-length passes, so the views are the per-length work now)
+        self.pass_times: Dict[str, float] = {}
+
+    def on_prefix_index(self, seconds: float):
+        """Called after the words were prepared for a board search."""
+        self.calls += 1
+        self.prefix_time += seconds
+
+    def on_start_cell(self, cell: Tuple[int, int], seconds: float, nodes: int, pruned: int):
+        """Called after the board was searched from a start cell."""
+        self.start_cell_times[cell] = self.start_cell_times.get(cell, 0.0) + seconds
+        self.search_time += seconds
+        self.nodes += nodes
+        self.pruned += pruned
+
+    def on_pass(self, name: str, seconds: float):
+        """Called after a result view was built."""
+        self.pass_times[name] = self.pass_times.get(name, 0.0) + seconds
+
+    def reset(self):
+        """Zero all the counters."""
+        self.__init__()
+
+    def as_dict(self) -> dict:
+        stats = dict(vars(self))
+        stats["start_cell_times"] = {"{},{}".format(*cell): seconds
+                                     for cell, seconds in self.start_cell_times.items()}
+        return stats
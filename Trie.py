@@ -0,0 +1,82 @@
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+class TrieNode:
+    """TrieNode - A single node of a {Trie}.
+        Holds the node's children by letter, whether the path to it is a full word,
+        and its height - the number of letters of the longest word continuing it."""
+    __slots__ = ("children", "is_word", "height")
+
+    def __init__(self):
+        self.children: Dict[str, "TrieNode"] = {}
+        self.is_word = False
+        self.height = 0
+
+class Trie:
+    """Trie - A prefix tree of words.
+        The trie is built once from a words dictionary, and later on can be walked
+        node-by-node: every step extends the current prefix with the letters of a
+        board cell, and dead prefixes are detected at once (the step returns None)."""
+    def __init__(self, words: Iterable[str] = ()):
+        self.root = TrieNode()
+        self.size = 0
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word: str):
+        """Insert a word to the trie."""
+        node = self.root
+        for letters_left in range(len(word), 0, -1):
+            node.height = max(node.height, letters_left)
+            char = word[len(word) - letters_left]
+            child = node.children.get(char)
+            if (child is None):
+                child = TrieNode()
+                node.children[char] = child
+            node = child
+        if (not node.is_word):
+            node.is_word = True
+            self.size += 1
+
+    def step(self, node: TrieNode, letters: str) -> Optional[TrieNode]:
+        """Walk from a given node with the given letters (a cell may hold more than one letter).
+            Returns the node of the extended prefix, None if no word starts with it."""
+        for char in letters:
+            next_node = node.children.get(char)
+            if (next_node is None):
+                return None
+            node = next_node
+        return node
+
+    def is_word(self, node: TrieNode) -> bool:
+        """Check if the prefix leading to the given node is a full word."""
+        return node.is_word
+
+    def height(self, node: TrieNode) -> int:
+        """Return the number of letters of the longest word continuing the given node's prefix."""
+        return node.height
+
+    def edges(self, node: TrieNode) -> Iterator[Tuple[str, TrieNode]]:
+        """Iterate the (letter, child node) edges of the given node."""
+        return iter(node.children.items())
+
+    def has_prefix(self, prefix: str) -> bool:
+        """Check if any word in the trie starts with the given prefix."""
+        return self.step(self.root, prefix) is not None
+
+    def __contains__(self, word: object) -> bool:
+        if (not isinstance(word, str)):
+            return False
+        node = self.step(self.root, word)
+        return node is not None and node.is_word
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[str]:
+        stack = [(self.root, "")]
+        while stack:
+            node, prefix = stack.pop()
+            if (node.is_word):
+                yield prefix
+            for char, child in node.children.items():
+                stack.append((child, prefix + char))
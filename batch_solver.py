@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterable, Iterator, List, Optional, TextIO, Tuple
+from boggle_board_randomizer import LETTERS, randomize_board
+from ex11_utils import solve_board
+from Lexicon import Lexicon
+from SharedLexicons import DICTIONARY_PATH, LEXICON_PATH, SharedLexicons, worker_lexicon
+
+Board = List[List[str]]
+#a task is a chunk of (id, board) items, or a chunk of boards to generate (first id, count, seed)
+BoardItem = Tuple[object, Board]
+
+CHUNK_SIZE = 64
+#chunks waiting per worker - keeps workers busy without reading the whole input to memory
+CHUNKS_PER_WORKER = 4
+
+def solve_to_record(board_id: object, board: Board, words: Lexicon, summary: bool = False) -> dict:
+    """Solve a board and return its JSON-ready result record. The record holds the
+        max-score path of every word, unless only a summary is asked for."""
+    solutions = solve_board(board, words, keep_paths=False)
+    record = {"id": board_id, "board": board, "word_count": len(solutions),
+              "max_score": sum(solution.get_score() for solution in solutions.values())}
+    if (not summary):
+        record["words"] = {word: solution.get_longest_path() for word, solution in solutions.items()}
+    return record
+
+def _solve_items(items: List[BoardItem], summary: bool) -> List[str]:
+    """Worker task - solve a chunk of boards, return their result lines."""
+    words = worker_lexicon("words")
+    return [json.dumps(solve_to_record(board_id, board, words, summary)) for board_id, board in items]
+
+def _solve_random(first_id: int, count: int, seed: Optional[int], summary: bool) -> List[str]:
+    """Worker task - generate a chunk of random boards and solve them.
+        A given seed makes the chunk reproducible."""
+    if (seed is not None):
+        random.seed(seed + first_id)
+    return _solve_items([(first_id + i, randomize_board()) for i in range(count)], summary)
+
+def read_boards(lines: Iterable[str]) -> Iterator[BoardItem]:
+    """Read boards from JSON lines. A line is either a board (list of rows)
+        or an object with "board" and an optional "id". Boards without an id are numbered."""
+    for line_number, line in enumerate(lines):
+        line = line.strip()
+        if (not line):
+            continue
+        item = json.loads(line)
+        if (isinstance(item, dict)):
+            yield (item.get("id", line_number), item["board"])
+        else:
+            yield (line_number, item)
+
+def _chunks(items: Iterable[BoardItem], size: int) -> Iterator[List[BoardItem]]:
+    chunk: List[BoardItem] = []
+    for item in items:
+        chunk.append(item)
+        if (len(chunk) == size):
+            yield chunk
+            chunk = []
+    if (chunk):
+        yield chunk
+
+def run_batch(executor: ProcessPoolExecutor, tasks: Iterator[Tuple], workers: int, output: TextIO) -> int:
+    """Submit the tasks to the pool with a bounded number of chunks in flight, and write
+        the result lines in input order. Returns the number of boards solved."""
+    pending: Deque[Future] = deque()
+    solved = 0
+    for task in tasks:
+        pending.append(executor.submit(*task))
+        if (len(pending) >= workers * CHUNKS_PER_WORKER):
+            solved += _write_lines(pending.popleft().result(), output)
+    while pending:
+        solved += _write_lines(pending.popleft().result(), output)
+    return solved
+
+def _write_lines(lines: List[str], output: TextIO) -> int:
+    for line in lines:
+        output.write(line)
+        output.write("\n")
+    return len(lines)
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Solve Boggle boards in batch, writing JSON lines results.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSON lines file of boards, '-' for stdin")
+    source.add_argument("--random", type=int, metavar="N", help="solve N random boards")
+    parser.add_argument("--seed", type=int, help="seed for random boards")
+    parser.add_argument("--output", default="-", help="output file, '-' for stdout (default)")
+    parser.add_argument("--dictionary", default=DICTIONARY_PATH, help="words dictionary file")
+    parser.add_argument("--lexicon", default=LEXICON_PATH, help="compiled lexicon file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="boards per worker task")
+    parser.add_argument("--summary", action="store_true", help="only write word count and max score")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = _parse_args(argv)
+    #random boards are rolled from the dice, only the words the dice can spell are needed
+    lexicons = SharedLexicons()
+    lexicons.publish_compiled("words", args.lexicon, args.dictionary, LETTERS if args.random is not None else None)
+    if (args.random is not None):
+        tasks: Iterator[Tuple] = ((_solve_random, first, min(args.chunk_size, args.random - first),
+                                   args.seed, args.summary)
+                                  for first in range(0, args.random, args.chunk_size))
+    else:
+        input_file = sys.stdin if args.input == "-" else open(args.input)
+        tasks = ((_solve_items, chunk, args.summary)
+                 for chunk in _chunks(read_boards(input_file), args.chunk_size))
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    start = time.perf_counter()
+    with lexicons, lexicons.executor(args.workers) as executor:
+        solved = run_batch(executor, tasks, args.workers, output)
+    elapsed = time.perf_counter() - start
+    output.flush()
+    print("Solved {} boards in {:.2f}s ({:.1f} boards/s, {} workers)".format(
+        solved, elapsed, solved / elapsed if elapsed > 0 else 0.0, args.workers), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
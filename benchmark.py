@@ -0,0 +1,233 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import ex11_utils
+import reference_ex11_utils
+from boggle_board_randomizer import LETTERS, deal_dice
+from IncrementalSolver import IncrementalSolver
+from Lexicon import load_lexicon
+from SolverStats import SolverStats
+from Trie import Trie
+
+Board = List[List[str]]
+
+DICTIONARY_PATH = "./boggle_dict.txt"
+LEXICON_PATH = "./boggle_dict.lex"
+RESULTS_PATH = "./benchmark_results.json"
+SEED = 2023
+#the corpus - number of boards per board size
+BOARDS_PER_SIZE = {4: 20, 5: 10, 6: 5, 10: 2}
+SYNTHETIC_SIZES = (20000, 100000)
+PATHS_LENGTH = 4
+WORDS_LENGTH = 5
+#the reference solvers are too slow for bigger boards and for the whole corpus
+CHECK_MAX_SIZE = 5
+CHECK_BOARDS = 5
+#incremental re-solves - single cell changes timed per board size
+INCREMENTAL_SIZES = (4, 5, 6, 7, 8, 9, 10)
+INCREMENTAL_CHANGES = 20
+
+def make_corpus(seed: int = SEED) -> Dict[int, List[Board]]:
+    """Return the fixed corpus of boards for every benchmarked size. Boards are rolled from
+        the classic dice like {randomize_board}, every die is used before any die is reused."""
+    rng = random.Random(seed)
+    return {size: [_roll_board(rng, size) for _ in range(count)] for size, count in BOARDS_PER_SIZE.items()}
+
+def _roll_board(rng: random.Random, size: int) -> Board:
+    letters = [rng.choice(LETTERS[die]) for die in deal_dice(len(LETTERS), size * size, rng)]
+    return [letters[row * size:(row + 1) * size] for row in range(size)]
+
+def synthetic_dictionary(count: int, seed: int = SEED) -> List[str]:
+    """Return a fixed dictionary of random words, letters weighted like the dice faces."""
+    rng = random.Random(seed + count)
+    faces = [face for die in LETTERS for face in die]
+    words = set()
+    while len(words) < count:
+        length = rng.choice((2, 3, 3, 4, 4, 4, 5, 5, 5, 6, 6, 7, 8, 9, 10))
+        words.add("".join(rng.choice(faces) for _ in range(length)))
+    return sorted(words)
+
+def _benchmarked_functions() -> Dict[str, Callable]:
+    """Every benchmarked function as (board, words, stats, paths) -> result. The paths
+        are the board's max-score paths, used by is_valid_path."""
+    return {
+        "find_length_n_paths": lambda board, words, stats, paths:
+            ex11_utils.find_length_n_paths(PATHS_LENGTH, board, words, stats),
+        "find_length_n_words": lambda board, words, stats, paths:
+            ex11_utils.find_length_n_words(WORDS_LENGTH, board, words, stats),
+        "max_score_paths": lambda board, words, stats, paths:
+            ex11_utils.max_score_paths(board, words, stats=stats),
+        "is_valid_path": lambda board, words, stats, paths:
+            [ex11_utils.is_valid_path(board, path, words) for path in paths],
+    }
+
+def run_benchmarks(corpus: Dict[int, List[Board]], dictionaries: Dict[str, Iterable[str]],
+                   repeat: int) -> List[dict]:
+    """Run every function on every board of the corpus, for every dictionary.
+        Wall time is the best of the repeats, peak memory is measured in a separate
+        traced run so tracing doesn't slow down the timed runs."""
+    results = []
+    for dictionary_name, words in dictionaries.items():
+        for size, boards in corpus.items():
+            boards_paths = [ex11_utils.max_score_paths(board, words) for board in boards]
+            for function_name, function in _benchmarked_functions().items():
+                stats = SolverStats()
+                wall = min(_timed_run(function, boards, boards_paths, words, stats if run == 0 else None)
+                           for run in range(repeat))
+                tracemalloc.start()
+                _timed_run(function, boards, boards_paths, words, None)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                results.append({"function": function_name, "size": size, "dictionary": dictionary_name,
+                                "boards": len(boards), "wall_s": wall, "peak_kib": peak / 1024,
+                                "nodes": stats.nodes})
+                print("{:<22}{:>4}x{:<4}{:<18}{:>10.4f}s {:>10.1f}KiB {:>10} nodes".format(
+                    function_name, size, size, dictionary_name, wall, peak / 1024, stats.nodes), file=sys.stderr)
+    return results
+
+def _timed_run(function: Callable, boards: List[Board], boards_paths: List[List], words: Iterable[str],
+               stats: Optional[SolverStats]) -> float:
+    start = time.perf_counter()
+    for board, paths in zip(boards, boards_paths):
+        function(board, words, stats, paths)
+    return time.perf_counter() - start
+
+def run_incremental_benchmarks(dictionaries: Dict[str, Iterable[str]], changes: int,
+                               seed: int = SEED) -> List[dict]:
+    """Time single cell changes of a board, re-solved by {IncrementalSolver} and by a full
+        max_score_paths, for every size up to 10x10. Both see the same random changes (a
+        face of a random die in a random cell), and their scores are checked to match."""
+    results = []
+    for dictionary_name, words in dictionaries.items():
+        rng = random.Random(seed)
+        for size in INCREMENTAL_SIZES:
+            board = _roll_board(rng, size)
+            solver = IncrementalSolver(board, words)
+            incremental, full, mismatches = 0.0, 0.0, 0
+            for _ in range(changes):
+                row, col = rng.randrange(size), rng.randrange(size)
+                letters = rng.choice(rng.choice(LETTERS))
+                start = time.perf_counter()
+                solver.replace_cell((row, col), letters)
+                incremental += time.perf_counter() - start
+                board[row][col] = letters
+                start = time.perf_counter()
+                paths = ex11_utils.max_score_paths(board, words)
+                full += time.perf_counter() - start
+                if (sum(len(path) ** 2 for path in paths) != solver.get_max_score()):
+                    mismatches += 1
+            speedup = _ratio(full, incremental)
+            results.append({"function": "replace_cell", "size": size, "dictionary": dictionary_name,
+                            "changes": changes, "incremental_s": incremental, "full_s": full,
+                            "speedup": speedup, "mismatches": mismatches})
+            print("{:<22}{:>4}x{:<4}{:<18}{:>10.4f}s {:>10.4f}s full {:>8.2f}x {:>4} mismatches".format(
+                "replace_cell", size, size, dictionary_name, incremental, full, speedup, mismatches),
+                file=sys.stderr)
+    return results
+
+def check_reference(corpus: Dict[int, List[Board]], dictionaries: Dict[str, Iterable[str]],
+                    reference_words: Dict[str, set], max_size: int, max_boards: int) -> List[str]:
+    """Compare the results of the solvers to the reference solvers on the first corpus boards
+        of every size up to the given size. Returns a description of every mismatch."""
+    mismatches = []
+    for dictionary_name, words in dictionaries.items():
+        reference = reference_words[dictionary_name]
+        for size, boards in corpus.items():
+            if (size > max_size):
+                continue
+            for board_i, board in enumerate(boards[:max_boards]):
+                where = "{} {}x{} board #{}".format(dictionary_name, size, size, board_i)
+                solutions = ex11_utils.solve_board(board, words)
+                for n in range(2, 7):
+                    if (ex11_utils.find_length_n_paths(n, board, words, solutions=solutions) !=
+                            reference_ex11_utils.find_length_n_paths(n, board, reference)):
+                        mismatches.append("find_length_n_paths({}) on {}".format(n, where))
+                    if (ex11_utils.find_length_n_words(n, board, words, solutions=solutions) !=
+                            reference_ex11_utils.find_length_n_words(n, board, reference)):
+                        mismatches.append("find_length_n_words({}) on {}".format(n, where))
+                paths = ex11_utils.max_score_paths(board, words, solutions=solutions)
+                if (paths != reference_ex11_utils.max_score_paths(board, reference)):
+                    mismatches.append("max_score_paths on " + where)
+                for path in paths:
+                    if (ex11_utils.is_valid_path(board, path, words) !=
+                            reference_ex11_utils.is_valid_path(board, path, reference)):
+                        mismatches.append("is_valid_path({}) on {}".format(path, where))
+                print("checked", where, file=sys.stderr)
+    return mismatches
+
+def compare_results(results: List[dict], previous: List[dict]):
+    """Print the time and memory ratios of the results to a previous run."""
+    previous_by_key = {(row["function"], row["size"], row["dictionary"]): row for row in previous}
+    print("{:<22}{:>6} {:<18}{:>10}{:>10}{:>10}".format("function", "size", "dictionary", "time", "memory", "nodes"))
+    for row in results:
+        old = previous_by_key.get((row["function"], row["size"], row["dictionary"]))
+        if (old is None):
+            continue
+        print("{:<22}{:>6} {:<18}{:>9.2f}x{:>9.2f}x{:>9.2f}x".format(
+            row["function"], row["size"], row["dictionary"], _ratio(row["wall_s"], old["wall_s"]),
+            _ratio(row["peak_kib"], old["peak_kib"]), _ratio(row["nodes"], old["nodes"])))
+
+def _ratio(new: float, old: float) -> float:
+    return new / old if old else float("nan")
+
+def _load_dictionaries(dictionary_path: str, lexicon_path: str) -> Tuple[Dict[str, Iterable[str]], Dict[str, set]]:
+    """Return the benchmarked dictionaries (prefix indexes, built outside the measurements)
+        and their plain word sets for the reference solvers."""
+    with open(dictionary_path) as words_file:
+        real_words = set(words_file.read().splitlines())
+    dictionaries: Dict[str, Iterable[str]] = {"boggle_dict": load_lexicon(lexicon_path, dictionary_path)}
+    reference_words = {"boggle_dict": real_words}
+    for count in SYNTHETIC_SIZES:
+        synthetic = synthetic_dictionary(count)
+        name = "synthetic_{}k".format(count // 1000)
+        dictionaries[name] = Trie(synthetic)
+        reference_words[name] = set(synthetic)
+    return dictionaries, reference_words
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the ex11_utils solvers on a fixed corpus of boards.")
+    parser.add_argument("--output", default=RESULTS_PATH, help="results JSON file")
+    parser.add_argument("--compare", help="results JSON file of a previous run to compare to")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement (best is kept)")
+    parser.add_argument("--check", action="store_true", help="check results against the reference solvers")
+    parser.add_argument("--check-max-size", type=int, default=CHECK_MAX_SIZE)
+    parser.add_argument("--check-boards", type=int, default=CHECK_BOARDS, help="boards checked per size")
+    parser.add_argument("--incremental-changes", type=int, default=INCREMENTAL_CHANGES,
+                        help="cell changes timed per size for the incremental re-solve (0 to skip)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--dictionary", default=DICTIONARY_PATH)
+    parser.add_argument("--lexicon", default=LEXICON_PATH)
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = _parse_args(argv)
+    corpus = make_corpus(args.seed)
+    dictionaries, reference_words = _load_dictionaries(args.dictionary, args.lexicon)
+    if (args.check):
+        mismatches = check_reference(corpus, dictionaries, reference_words, args.check_max_size,
+                                     args.check_boards)
+        for mismatch in mismatches:
+            print("MISMATCH:", mismatch)
+        if (mismatches):
+            sys.exit(1)
+        print("All results match the reference solvers")
+    results = run_benchmarks(corpus, dictionaries, args.repeat)
+    incremental = []
+    if (args.incremental_changes > 0):
+        incremental = run_incremental_benchmarks(dictionaries, args.incremental_changes, args.seed)
+    with open(args.output, "w") as results_file:
+        json.dump({"seed": args.seed, "python": platform.python_version(),
+                   "time": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results,
+                   "incremental": incremental}, results_file, indent=1)
+    if (args.compare is not None):
+        with open(args.compare) as previous_file:
+            compare_results(results, json.load(previous_file)["results"])
+
+
+if __name__ == "__main__":
+    main()
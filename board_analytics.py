@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from boggle_board_randomizer import BOARD_SIZE, LETTERS
+from board_generator import board_stats
+from SharedLexicons import DICTIONARY_PATH, LEXICON_PATH, SharedLexicons, worker_lexicon
+
+Board = List[List[str]]
+Dice = List[List[str]]
+
+CHUNK_SIZE = 1024
+HISTOGRAM_BINS = 20
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+#columns of a chunk's stats array
+METRICS = ("max_score", "word_count", "longest_word")
+
+class BoardSampler:
+    """BoardSampler - Draws random boards in batches, the way randomize_board draws one,
+        for any dice list and board size. A batch is a NumPy array of N boards by cells,
+        each cell an index into the flat faces of all the dice: every board deals shuffled
+        full sets of the dice (reused on boards bigger than the dice list) and rolls a face
+        of each dealt die, with no Python loop over boards or cells."""
+    def __init__(self, dice_list: Dice = LETTERS, board_size: int = BOARD_SIZE, seed: Optional[int] = None):
+        self.board_size = board_size
+        self.cells = board_size ** 2
+        self.dice_count = len(dice_list)
+        #full sets dealt per board, the last one possibly in part
+        self.sets = -(-self.cells // self.dice_count)
+        self.faces = np.array([face for die in dice_list for face in die], dtype=object)
+        self.face_counts = np.array([len(die) for die in dice_list])
+        self.face_offsets = np.concatenate(([0], np.cumsum(self.face_counts)[:-1]))
+        self.rng = np.random.default_rng(seed)
+
+    def sample(self, count: int) -> np.ndarray:
+        """Draw count boards, as a (count, cells) array of face indices."""
+        dice = np.broadcast_to(np.arange(self.dice_count), (count, self.sets, self.dice_count))
+        dice = self.rng.permuted(dice, axis=2).reshape(count, -1)[:, :self.cells]
+        rolls = (self.rng.random((count, self.cells)) * self.face_counts[dice]).astype(np.intp)
+        return self.face_offsets[dice] + rolls
+
+    def to_boards(self, faces: np.ndarray) -> List[Board]:
+        """Turn a batch of face indices to boards (lists of rows of letters)."""
+        return self.faces[faces].reshape(-1, self.board_size, self.board_size).tolist()
+
+def summarize(values: np.ndarray, bins: int = HISTOGRAM_BINS, percents: Sequence[int] = PERCENTILES) -> dict:
+    """Return the mean, standard deviation, range, percentiles and histogram of a metric."""
+    bins = max(1, min(bins, int(values.max() - values.min()) + 1))
+    counts, edges = np.histogram(values, bins=bins)
+    return {"mean": float(values.mean()), "std": float(values.std()),
+            "min": int(values.min()), "max": int(values.max()),
+            "percentiles": {"p{}".format(percent): float(value)
+                            for percent, value in zip(percents, np.percentile(values, percents))},
+            "histogram": {"edges": edges.tolist(), "counts": counts.tolist()}}
+
+#the dice rolled by the worker process, set by its initializer
+_worker_dice: Dice = LETTERS
+_worker_board_size = BOARD_SIZE
+
+def _init_worker(dice_list: Dice, board_size: int):
+    global _worker_dice, _worker_board_size
+    _worker_dice = dice_list
+    _worker_board_size = board_size
+
+def _analyze_chunk(count: int, seed: int) -> np.ndarray:
+    """Worker task - sample a batch of boards and solve them, return a (count, metrics) array."""
+    words = worker_lexicon("words")
+    sampler = BoardSampler(_worker_dice, _worker_board_size, seed)
+    stats = np.empty((count, len(METRICS)), dtype=np.int64)
+    for board_i, board in enumerate(sampler.to_boards(sampler.sample(count))):
+        board_stat = board_stats(board, words)
+        stats[board_i] = (board_stat["max_score"], board_stat["word_count"], len(board_stat["longest_word"]))
+    return stats
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Solve many random boards and report the distribution "
+                                                 "of their max score, word count and longest word length.")
+    parser.add_argument("--count", type=int, required=True, help="number of boards to sample")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help="board size")
+    parser.add_argument("--dice", help="JSON file of the dice list (default - the classic dice)")
+    parser.add_argument("--bins", type=int, default=HISTOGRAM_BINS, help="histogram bins per metric")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="boards per worker task")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", default="-", help="JSON report file, '-' for stdout (default)")
+    parser.add_argument("--dictionary", default=DICTIONARY_PATH)
+    parser.add_argument("--lexicon", default=LEXICON_PATH)
+    return parser.parse_args(argv)
+
+def main(argv: Optional[Sequence[str]] = None):
+    args = _parse_args(argv)
+    dice_list = LETTERS
+    if (args.dice is not None):
+        with open(args.dice) as dice_file:
+            dice_list = json.load(dice_file)
+    lexicons = SharedLexicons()
+    lexicons.publish_compiled("words", args.lexicon, args.dictionary, dice_list, args.size)
+    base_seed = args.seed if args.seed is not None else int(np.random.SeedSequence().entropy % 2 ** 32)
+    firsts = range(0, args.count, args.chunk_size)
+    start = time.perf_counter()
+    with lexicons, lexicons.executor(args.workers, _init_worker, (dice_list, args.size)) as executor:
+        chunks = list(executor.map(_analyze_chunk, [min(args.chunk_size, args.count - first) for first in firsts],
+                                   [base_seed + first for first in firsts]))
+    elapsed = time.perf_counter() - start
+    stats = np.concatenate(chunks) if len(chunks) > 0 else np.empty((0, len(METRICS)), dtype=np.int64)
+    report: Dict[str, object] = {"boards": len(stats), "board_size": args.size, "seed": base_seed}
+    if (len(stats) > 0):
+        report["metrics"] = {metric: summarize(stats[:, metric_i], args.bins) for metric_i, metric in enumerate(METRICS)}
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    json.dump(report, output, indent=1)
+    output.write("\n")
+    output.flush()
+    print("Analyzed {} boards in {:.2f}s ({:.1f} boards/s, {} workers)".format(
+        len(stats), elapsed, len(stats) / elapsed if elapsed > 0 else 0.0, args.workers), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Iterable, List, Optional, Sequence, Tuple
+from boggle_board_randomizer import LETTERS, BOARD_SIZE, deal_dice
+from ex11_utils import PrefixIndex, solve_board
+from SharedLexicons import DICTIONARY_PATH, LEXICON_PATH, SharedLexicons, worker_lexicon
+
+Board = List[List[str]]
+Dice = List[List[str]]
+
+RARE_LETTERS = ("J", "K", "Q", "QU", "V", "X", "Z")
+MAX_REPAIRS = 60
+#candidates (rolled or repaired) tried for a single board before giving up on the constraints
+MAX_CANDIDATES = 10000
+CHUNK_SIZE = 8
+
+class ConstraintsUnmetError(Exception):
+    """No board meeting the constraints was found within the candidates limit."""
+
+class BoardConstraints:
+    """BoardConstraints - The requirements a generated board should meet.
+        Every constraint is optional (None means no requirement)."""
+    def __init__(self, min_words: Optional[int] = None, max_words: Optional[int] = None,
+                 min_score: Optional[int] = None, max_score: Optional[int] = None,
+                 min_longest: Optional[int] = None, required_words: Sequence[str] = (),
+                 max_rare_share: Optional[float] = None, rare_letters: Sequence[str] = RARE_LETTERS):
+        self.min_words = min_words
+        self.max_words = max_words
+        self.min_score = min_score
+        self.max_score = max_score
+        self.min_longest = min_longest
+        self.required_words = tuple(required_words)
+        self.max_rare_share = max_rare_share
+        self.rare_letters = frozenset(rare_letters)
+
+    def violation(self, stats: dict) -> float:
+        """Return how far the board's stats are from meeting the constraints,
+            each constraint adds its relative miss. 0 means all are met."""
+        violation = 0.0
+        violation += _miss_below(stats["word_count"], self.min_words)
+        violation += _miss_above(stats["word_count"], self.max_words)
+        violation += _miss_below(stats["max_score"], self.min_score)
+        violation += _miss_above(stats["max_score"], self.max_score)
+        violation += _miss_below(len(stats["longest_word"]), self.min_longest)
+        if (self.required_words):
+            missing = sum(1 for word in self.required_words if word not in stats["words"])
+            violation += missing / len(self.required_words)
+        if (self.max_rare_share is not None):
+            violation += max(0.0, stats["rare_share"] - self.max_rare_share)
+        return violation
+
+def _miss_below(value: float, minimum: Optional[float]) -> float:
+    if (minimum is None or value >= minimum):
+        return 0.0
+    return (minimum - value) / max(minimum, 1)
+
+def _miss_above(value: float, maximum: Optional[float]) -> float:
+    if (maximum is None or value <= maximum):
+        return 0.0
+    return (value - maximum) / max(maximum, 1)
+
+def board_stats(board: Board, words: PrefixIndex, rare_letters: Iterable[str] = RARE_LETTERS) -> dict:
+    """Solve the board and return its stats - the words found, their count, the total
+        max score, the longest word and the share of cells with rare letters."""
+    solutions = solve_board(board, words, keep_paths=False)
+    rare = frozenset(rare_letters)
+    cells = [cell for row in board for cell in row]
+    return {"words": solutions.keys(),
+            "word_count": len(solutions),
+            "max_score": sum(solution.get_score() for solution in solutions.values()),
+            "longest_word": max(solutions, key=len, default=""),
+            "rare_share": sum(1 for cell in cells if cell in rare) / len(cells)}
+
+class BoardGenerator:
+    """BoardGenerator - Generates boards that meet given {BoardConstraints}.
+        A candidate board is rolled like randomize_board does, for any dice list and board
+        size. Candidates that miss the constraints are repaired by hill-climbing - rolling
+        one die again or swapping two dice - and dropped if they can't be repaired.
+        Constraints may be impossible to meet, so a board gives up after max_candidates."""
+    def __init__(self, words: PrefixIndex, constraints: BoardConstraints, dice_list: Dice = LETTERS,
+                 board_size: int = BOARD_SIZE, max_repairs: int = MAX_REPAIRS, rng: Optional[random.Random] = None,
+                 max_candidates: int = MAX_CANDIDATES):
+        self.words = words
+        self.constraints = constraints
+        self.dice_list = dice_list
+        self.board_size = board_size
+        self.max_repairs = max_repairs
+        self.max_candidates = max_candidates
+        self.rng = rng or random.Random()
+        self.candidates = 0
+
+    def generate(self) -> Tuple[Board, dict]:
+        """Return a board meeting the constraints, with its stats. Raises {ConstraintsUnmetError}
+            if none was found within max_candidates."""
+        first_candidate = self.candidates
+        while (self.candidates - first_candidate < self.max_candidates):
+            dice, faces = self._roll()
+            stats = self._stats(dice, faces)
+            violation = self.constraints.violation(stats)
+            for _ in range(self.max_repairs):
+                if (violation == 0):
+                    break
+                new_dice, new_faces = self._mutate(dice, faces)
+                new_stats = self._stats(new_dice, new_faces)
+                new_violation = self.constraints.violation(new_stats)
+                #sideways moves are allowed, to get off plateaus
+                if (new_violation <= violation):
+                    dice, faces, stats, violation = new_dice, new_faces, new_stats, new_violation
+            if (violation == 0):
+                return self._to_board(dice, faces), stats
+        raise ConstraintsUnmetError("No board met the constraints in {} candidates".format(self.max_candidates))
+
+    def _roll(self) -> Tuple[List[int], List[int]]:
+        """Roll a new candidate - the die at each cell and its face."""
+        dice = deal_dice(len(self.dice_list), self.board_size ** 2, self.rng)
+        faces = [self.rng.randrange(len(self.dice_list[die])) for die in dice]
+        return dice, faces
+
+    def _mutate(self, dice: List[int], faces: List[int]) -> Tuple[List[int], List[int]]:
+        """Return a copy of the candidate with one die rolled again (possibly replaced by
+            an unused die), or with two dice swapped."""
+        dice, faces = dice.copy(), faces.copy()
+        cell = self.rng.randrange(len(dice))
+        if (self.rng.random() < 0.5):
+            other = self.rng.randrange(len(dice))
+            dice[cell], dice[other] = dice[other], dice[cell]
+            faces[cell], faces[other] = faces[other], faces[cell]
+        else:
+            unused = len(self.dice_list) - len(dice)
+            if (unused > 0 and self.rng.random() < unused / len(self.dice_list)):
+                dice[cell] = self.rng.choice(sorted(set(range(len(self.dice_list))) - set(dice)))
+            faces[cell] = self.rng.randrange(len(self.dice_list[dice[cell]]))
+        return dice, faces
+
+    def _stats(self, dice: List[int], faces: List[int]) -> dict:
+        self.candidates += 1
+        return board_stats(self._to_board(dice, faces), self.words, self.constraints.rare_letters)
+
+    def _to_board(self, dice: List[int], faces: List[int]) -> Board:
+        letters = [self.dice_list[die][face] for die, face in zip(dice, faces)]
+        return [letters[row * self.board_size:(row + 1) * self.board_size] for row in range(self.board_size)]
+
+
+#the generator of the worker process, set by its initializer
+_worker_generator: Optional[BoardGenerator] = None
+
+def _init_worker(constraints: BoardConstraints, dice_list: Dice, board_size: int, max_repairs: int,
+                 max_candidates: int):
+    global _worker_generator
+    _worker_generator = BoardGenerator(worker_lexicon("words"), constraints, dice_list, board_size, max_repairs,
+                                       max_candidates=max_candidates)
+
+def _generate_chunk(count: int, seed: Optional[int]) -> Tuple[List[str], int]:
+    """Worker task - generate boards, return their result lines and the number of candidates tried."""
+    assert _worker_generator is not None
+    _worker_generator.rng.seed(seed)
+    _worker_generator.candidates = 0
+    lines = []
+    for _ in range(count):
+        board, stats = _worker_generator.generate()
+        lines.append(json.dumps({"board": board, "word_count": stats["word_count"],
+                                 "max_score": stats["max_score"], "longest_word": stats["longest_word"],
+                                 "rare_share": stats["rare_share"]}))
+    return lines, _worker_generator.candidates
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate Boggle boards meeting given constraints.")
+    parser.add_argument("--count", type=int, required=True, help="number of boards to generate")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help="board size")
+    parser.add_argument("--dice", help="JSON file of the dice list (default - the classic dice)")
+    parser.add_argument("--min-words", type=int)
+    parser.add_argument("--max-words", type=int)
+    parser.add_argument("--min-score", type=int)
+    parser.add_argument("--max-score", type=int)
+    parser.add_argument("--min-longest", type=int, help="minimal length of the longest word")
+    parser.add_argument("--require", action="append", default=[], metavar="WORD", help="word that must be on the board")
+    parser.add_argument("--max-rare-share", type=float, help="maximal share of cells with rare letters")
+    parser.add_argument("--max-repairs", type=int, default=MAX_REPAIRS, help="repair steps before dropping a candidate")
+    parser.add_argument("--max-candidates", type=int, default=MAX_CANDIDATES,
+                        help="candidates tried per board before failing on unmet constraints")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", default="-", help="output file, '-' for stdout (default)")
+    parser.add_argument("--dictionary", default=DICTIONARY_PATH)
+    parser.add_argument("--lexicon", default=LEXICON_PATH)
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = _parse_args(argv)
+    dice_list = LETTERS
+    if (args.dice is not None):
+        with open(args.dice) as dice_file:
+            dice_list = json.load(dice_file)
+    constraints = BoardConstraints(args.min_words, args.max_words, args.min_score, args.max_score,
+                                   args.min_longest, [word.upper() for word in args.require], args.max_rare_share)
+    #only the words the dice can spell on boards of this size
+    lexicons = SharedLexicons()
+    lexicons.publish_compiled("words", args.lexicon, args.dictionary, dice_list, args.size)
+    base_seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+    chunks = [(min(CHUNK_SIZE, args.count - first), base_seed + first) for first in range(0, args.count, CHUNK_SIZE)]
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    start = time.perf_counter()
+    generated, candidates = 0, 0
+    with lexicons, lexicons.executor(args.workers, _init_worker,
+                                     (constraints, dice_list, args.size, args.max_repairs,
+                                      args.max_candidates)) as executor:
+        try:
+            for lines, chunk_candidates in executor.map(_generate_chunk, *zip(*chunks)):
+                for line in lines:
+                    output.write(line)
+                    output.write("\n")
+                generated += len(lines)
+                candidates += chunk_candidates
+        except ConstraintsUnmetError as error:
+            #the other chunks would fail the same - don't wait for the queued ones
+            executor.shutdown(cancel_futures=True)
+            output.flush()
+            print("Generation failed after {} boards: {}".format(generated, error), file=sys.stderr)
+            sys.exit(1)
+    elapsed = time.perf_counter() - start
+    output.flush()
+    print("Generated {} boards in {:.2f}s ({:.2f} boards/s, {:.1f} candidates/s, {} workers)".format(
+        generated, elapsed, generated / elapsed, candidates / elapsed, args.workers), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
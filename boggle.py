@@ -1,11 +1,69 @@
+import time
+#process start, before the heavy imports - for the startup profile
+START_TIME = time.perf_counter()
+import argparse
+import sys
+from typing import Dict, List, Optional
+from BackgroundLoader import BackgroundLoader
 from Game import Game, Difficulty
-from boggle_board_randomizer import BOARD_SIZE
+from boggle_board_randomizer import BOARD_SIZE, LETTERS
+from dice_lexicon import load_dice_lexicon
+from Lexicon import Lexicon
+from SolutionCache import SolutionCache
+IMPORTS_TIME = time.perf_counter()
 
 TIMER_COUNTDOWN = (3, 0)
 DICTIONARY_PATH = "./boggle_dict.txt"
+#compiled from the dictionary on first run (only the words the dice can spell on the board's size),
+# memory-mapped afterwards
+LEXICON_PATH = "./boggle_dict.lex"
+#solved boards are kept across games and runs
+SOLUTIONS_CACHE_PATH = "./boggle_solutions.sqlite"
 
-if __name__ == "__main__":
-    all_words = set(open(DICTIONARY_PATH).read().splitlines())
+class StartupProfile:
+    """StartupProfile - Reports on stderr when each startup step is done, in seconds
+        since the process started (disabled, it reports nothing)."""
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+
+    def report(self, step: str, seconds: Optional[float] = None, done_time: Optional[float] = None):
+        """Report a step that took the given seconds (if known), done at the given time (now if not given)."""
+        if (not self.enabled):
+            return
+        done_time = done_time if done_time is not None else time.perf_counter()
+        took = "" if seconds is None else " took {:.3f}s,".format(seconds)
+        print("startup: {:<16}{} done at {:.3f}s".format(step, took, done_time - START_TIME), file=sys.stderr)
+
+def _load_words(board_size: int, profile: StartupProfile) -> Lexicon:
+    timings: Dict[str, float] = {}
+    lexicon = load_dice_lexicon(LEXICON_PATH, DICTIONARY_PATH, LETTERS, board_size, timings)
+    profile.report("index build", timings["index_build"])
+    profile.report("dictionary load", timings["dictionary_load"])
+    return lexicon
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Play Boggle.")
+    parser.add_argument("--board-size", type=int, default=BOARD_SIZE,
+                        help="number of rows (and columns) of the board, dice are reused on big boards")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="report the import, dictionary load, index build and first frame times on stderr")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    args = _parse_args(argv)
+    profile = StartupProfile(args.startup_profile)
+    profile.report("imports", IMPORTS_TIME - START_TIME, IMPORTS_TIME)
+    #the window shows right away, the dictionary loads (or compiles, on first run) meanwhile
+    # and only the first word check waits for it if it's not done yet
+    all_words = BackgroundLoader(lambda: _load_words(args.board_size, profile), "load words")
+    cache = BackgroundLoader(lambda: SolutionCache(all_words.get().fingerprint(), SOLUTIONS_CACHE_PATH),
+                             "load solutions cache")
     #Change difficulty between EASY/MEDIUM/HARD
-    game = Game(BOARD_SIZE, TIMER_COUNTDOWN, all_words, Difficulty.EASY)
+    game = Game(args.board_size, TIMER_COUNTDOWN, all_words, Difficulty.EASY, cache)
+    #idle callbacks run once the pending redraws are done, the window's first frame included
+    game.window.after_idle(lambda: profile.report("first frame"))
     game.start()
+
+
+if __name__ == "__main__":
+    main()
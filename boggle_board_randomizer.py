@@ -5,7 +5,7 @@
 # DESCRIPTION:A helper file for ex11 that randomizes a Boggle board
 ##############################################################################
 import random
-from typing import List
+from typing import List, Optional
 
 
 BOARD_SIZE = 4
@@ -29,19 +29,40 @@ LETTERS = [
 ]
 
 
-def randomize_board(dice_list: List[List[str]] = LETTERS) -> List[List[str]]:
+def deal_dice(dice_count: int, cells: int, rng: Optional[random.Random] = None) -> List[int]:
+    """
+    Deals dice to the cells of a board, in a random order.
+    When the board has more cells than there are dice, the dice are reused - every
+    die is dealt once before any die is dealt again.
+    :param dice_count: number of dice to deal from.
+    :param cells: number of cells on the board.
+    :param rng: random generator to deal with, the random module's if not given.
+    :return: the index of the die dealt to each cell.
+    """
+    if (dice_count == 0 and cells > 0):
+        raise ValueError("No dice to deal")
+    shuffle = rng.shuffle if rng is not None else random.shuffle
+    dice_indices: List[int] = []
+    while (len(dice_indices) < cells):
+        dice_set = list(range(dice_count))
+        shuffle(dice_set)
+        dice_indices.extend(dice_set[:cells - len(dice_indices)])
+    return dice_indices
+
+
+def randomize_board(dice_list: List[List[str]] = LETTERS, board_size: int = BOARD_SIZE) -> List[List[str]]:
     """
     Creates a random Boggle board.
     :param dice_list: 2-dimensional list of letters to generate the board from.
+    :param board_size: number of rows (and columns) of the board, dice are reused
+        if the board has more cells than there are dice.
     :return: a 2D list of strings representing a random Boggle board.
     """
-    dice_indices = list(range(len(dice_list)))
-    random.shuffle(dice_indices)
-    dice_indices_iter = iter(dice_indices)
+    dice_indices_iter = iter(deal_dice(len(dice_list), board_size ** 2))
     board = []
-    for i in range(BOARD_SIZE):
+    for i in range(board_size):
         row = []
-        for j in range(BOARD_SIZE):
+        for j in range(board_size):
             die = dice_list[next(dice_indices_iter)]
             letter = random.choice(die)
             row.append(letter)
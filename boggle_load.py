@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from boggle_server import HOST, LINE_LIMIT, PORT, percentiles
+from ex11_utils import get_neighbors
+
+Board = List[List[str]]
+
+CLIENTS = 50
+SESSIONS_PER_CLIENT = 4
+WORDS_PER_SESSION = 20
+#every this many words, the client asks for a hint
+HINT_EVERY = 5
+MAX_WORD_CELLS = 6
+
+class LoadClient:
+    """LoadClient - A single connection to the server, playing sessions like a (fast) player:
+        random walks on the board checked as words, and hints now and then.
+        The latency of every request is recorded by operation."""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, rng: random.Random,
+                 latencies: Dict[str, List[float]], dictionary: Optional[str] = None):
+        self.reader = reader
+        self.writer = writer
+        self.rng = rng
+        self.latencies = latencies
+        self.dictionary = dictionary
+        self.errors = 0
+        self.words_found = 0
+
+    async def request(self, op: str, **fields) -> dict:
+        start = time.perf_counter()
+        self.writer.write(json.dumps({"op": op, **fields}).encode())
+        self.writer.write(b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        self.latencies.setdefault(op, []).append(time.perf_counter() - start)
+        if (not line):
+            raise ConnectionError("Server closed the connection")
+        response = json.loads(line)
+        if (not response["ok"]):
+            self.errors += 1
+        return response
+
+    async def play_session(self, words_per_session: int):
+        response = await self.request("new", **({"dictionary": self.dictionary} if self.dictionary else {}))
+        if (not response["ok"]):
+            raise ConnectionError(response["error"])
+        session = response["session"]
+        board: Board = response["state"]["board"]
+        size = len(board)
+        neighbors = get_neighbors(size, size)
+        for word_i in range(words_per_session):
+            if (word_i % HINT_EVERY == HINT_EVERY - 1):
+                await self.request("hint", session=session)
+                await self.request("reset", session=session)
+            for cell in self._random_walk(neighbors, size * size):
+                await self.request("select", session=session, cell=divmod(cell, size))
+            response = await self.request("check", session=session)
+            if (response.get("word") is not None):
+                self.words_found += 1
+        await self.request("finish", session=session)
+        await self.request("close", session=session)
+
+    def _random_walk(self, neighbors: Tuple[Tuple[int, ...], ...], cells: int) -> List[int]:
+        """A random path of adjacent, distinct cells."""
+        walk = [self.rng.randrange(cells)]
+        for _ in range(self.rng.randint(2, MAX_WORD_CELLS) - 1):
+            options = [cell for cell in neighbors[walk[-1]] if cell not in walk]
+            if (len(options) == 0):
+                break
+            walk.append(self.rng.choice(options))
+        return walk
+
+async def _open(args: argparse.Namespace) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    if (args.unix is not None):
+        return await asyncio.open_unix_connection(args.unix, limit=LINE_LIMIT)
+    return await asyncio.open_connection(args.host, args.port, limit=LINE_LIMIT)
+
+async def _run_client(args: argparse.Namespace, client_i: int, latencies: Dict[str, List[float]]) -> LoadClient:
+    reader, writer = await _open(args)
+    client = LoadClient(reader, writer, random.Random(args.seed + client_i), latencies, args.dictionary)
+    try:
+        for _ in range(args.sessions):
+            await client.play_session(args.words)
+    finally:
+        writer.close()
+    return client
+
+async def run_load(args: argparse.Namespace):
+    """Run all the clients concurrently, then print the client side throughput and
+        latencies, and the server's own stats."""
+    latencies: Dict[str, List[float]] = {}
+    start = time.perf_counter()
+    clients = await asyncio.gather(*(_run_client(args, client_i, latencies) for client_i in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    requests = sum(len(samples) for samples in latencies.values())
+    print("{} clients, {} sessions, {} requests in {:.2f}s ({:.1f} req/s), {} errors, {} words found".format(
+        args.clients, args.clients * args.sessions, requests, elapsed, requests / elapsed if elapsed > 0 else 0.0,
+        sum(client.errors for client in clients), sum(client.words_found for client in clients)))
+    for op, samples in sorted(latencies.items()):
+        print("{:<8}{:>8} requests  {}".format(op, len(samples), "  ".join(
+            "{} {:.2f}ms".format(name, seconds * 1000) for name, seconds in percentiles(samples).items())))
+    reader, writer = await _open(args)
+    stats_client = LoadClient(reader, writer, random.Random(args.seed), {})
+    print("server:", json.dumps(await stats_client.request("stats"), indent=1))
+    writer.close()
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate load on a Boggle server with concurrent playing clients.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", help="connect to a unix socket at this path instead")
+    parser.add_argument("--clients", type=int, default=CLIENTS, help="concurrent connections")
+    parser.add_argument("--sessions", type=int, default=SESSIONS_PER_CLIENT, help="sessions played per client")
+    parser.add_argument("--words", type=int, default=WORDS_PER_SESSION, help="words tried per session")
+    parser.add_argument("--dictionary", help="dictionary name the sessions play with (server's default if not given)")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    try:
+        asyncio.run(run_load(_parse_args(argv)))
+    except ConnectionError as error:
+        print("Load failed:", error, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
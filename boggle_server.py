@@ -0,0 +1,333 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Executor
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+from boggle_board_randomizer import BOARD_SIZE
+from ex11_utils import max_score_paths
+from GameEngine import GameEngine, Difficulty
+from Lexicon import Lexicon
+from SharedLexicons import (DICTIONARY_PATH, LEXICON_PATH, SharedLexicons, attach_lexicons, use_worker_lexicons,
+                            worker_lexicon)
+
+Board = List[List[str]]
+Path = List[Tuple[int, int]]
+
+#name of the dictionary sessions play with, unless they ask for another one
+DEFAULT_DICTIONARY = "default"
+HOST = "127.0.0.1"
+PORT = 8765
+TIMER_COUNTDOWN = (3, 0)
+#idle sessions are dropped after this many seconds
+SESSION_TTL = 600
+REPORT_INTERVAL = 10
+#latest latencies kept per operation for the percentiles
+LATENCY_SAMPLES = 10000
+PERCENTILES = (50, 90, 99)
+#longest request / response line, big boards have long states
+LINE_LIMIT = 1 << 20
+
+def _solve_hints(dictionary: str, board: Board) -> List[Path]:
+    """Worker task - the max-score paths of a board, for the named dictionary."""
+    return max_score_paths(board, worker_lexicon(dictionary))
+
+def percentiles(samples: Sequence[float], percents: Sequence[int] = PERCENTILES) -> Dict[str, float]:
+    """Return the given percentiles of the samples (nearest rank), keyed 'p<percent>'."""
+    ordered = sorted(samples)
+    result = {}
+    for percent in percents:
+        if (len(ordered) == 0):
+            result["p{}".format(percent)] = 0.0
+        else:
+            rank = max(0, -(-percent * len(ordered) // 100) - 1)
+            result["p{}".format(percent)] = ordered[rank]
+    return result
+
+class SolveError(Exception):
+    """Solving a board for hints failed (in the executor)."""
+
+class ServerMetrics:
+    """ServerMetrics - Requests count and latencies of every operation served.
+        Only the latest latencies are kept, so percentiles describe the recent load."""
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.counts: Dict[str, int] = {}
+        self.errors = 0
+        self.latencies: Dict[str, Deque[float]] = {}
+
+    def record(self, op: str, seconds: float, ok: bool):
+        self.counts[op] = self.counts.get(op, 0) + 1
+        if (not ok):
+            self.errors += 1
+        samples = self.latencies.get(op)
+        if (samples is None):
+            samples = self.latencies[op] = deque(maxlen=LATENCY_SAMPLES)
+        samples.append(seconds)
+
+    def report(self) -> dict:
+        """Return the throughput and the latency percentiles (in milliseconds) of every operation."""
+        elapsed = time.perf_counter() - self.start_time
+        total = sum(self.counts.values())
+        ops = {}
+        for op, count in self.counts.items():
+            ops[op] = {"count": count, **{name: seconds * 1000 for name, seconds in
+                                         percentiles(self.latencies[op]).items()}}
+        return {"uptime_s": elapsed, "requests": total, "errors": self.errors,
+                "requests_per_s": total / elapsed if elapsed > 0 else 0.0, "ops": ops}
+
+class Session:
+    """Session - A single player's game on the server, with its board's hints being solved."""
+    def __init__(self, engine: GameEngine, dictionary: str):
+        self.engine = engine
+        self.dictionary = dictionary
+        self.hints: Optional["asyncio.Future[List[Path]]"] = None
+        self.last_used = time.monotonic()
+
+class BoggleServer:
+    """BoggleServer - Hosts many game sessions, each one a {GameEngine}.
+        Requests and responses are JSON lines, every request names its operation ("op")
+        and, except for "new" and "stats", its session. Sessions share the server's words
+        dictionaries (by name), and their boards are solved for hints on one worker pool."""
+    def __init__(self, words: Dict[str, Lexicon], executor: Optional[Executor], board_size: int,
+                 difficulty: str = Difficulty.EASY, session_ttl: float = SESSION_TTL):
+        self.words = words
+        self.executor = executor
+        self.board_size = board_size
+        self.difficulty = difficulty
+        self.session_ttl = session_ttl
+        self.sessions: Dict[str, Session] = {}
+        self.metrics = ServerMetrics()
+        self._ops: Dict[str, Callable[[dict], Awaitable[dict]]] = {
+            "new": self._new, "select": self._select, "reset": self._reset, "check": self._check,
+            "hint": self._hint, "state": self._state, "finish": self._finish, "close": self._close,
+            "stats": self._stats}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve the requests of a connection, one response line per request line, in order."""
+        try:
+            while True:
+                line = await reader.readline()
+                if (not line):
+                    break
+                response = await self.handle_request(line)
+                writer.write(json.dumps(response).encode())
+                writer.write(b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, line: bytes) -> dict:
+        start = time.perf_counter()
+        op = "invalid"
+        request_id = None
+        try:
+            request = json.loads(line)
+            if (not isinstance(request, dict)):
+                raise ValueError("A request is a JSON object")
+            request_id = request.get("id")
+            op = str(request.get("op"))
+            handler = self._ops.get(op)
+            if (handler is None):
+                raise ValueError("Unknown op: " + op)
+            response = await handler(request)
+            response["ok"] = True
+        except (ValueError, KeyError, TypeError, SolveError) as error:
+            response = {"ok": False, "error": str(error)}
+        if (request_id is not None):
+            response["id"] = request_id
+        self.metrics.record(op, time.perf_counter() - start, response["ok"])
+        return response
+
+    def expire_sessions(self) -> int:
+        """Drop the sessions idle for longer than the TTL. Returns the number dropped."""
+        now = time.monotonic()
+        expired = [session_id for session_id, session in self.sessions.items()
+                   if now - session.last_used > self.session_ttl]
+        for session_id in expired:
+            self._drop(session_id)
+        return len(expired)
+
+    def _get_session(self, request: dict) -> Session:
+        session = self.sessions.get(request["session"])
+        if (session is None):
+            raise KeyError("No such session: {}".format(request["session"]))
+        session.last_used = time.monotonic()
+        return session
+
+    def _drop(self, session_id: str):
+        session = self.sessions.pop(session_id, None)
+        if (session is not None and session.hints is not None):
+            session.hints.cancel()
+
+    def _start_game(self, session: Session, board: Optional[Board]):
+        if (session.hints is not None):
+            session.hints.cancel()
+        session.engine.new_game(board)
+        session.hints = None
+        if (self.difficulty != Difficulty.HARD):
+            loop = asyncio.get_running_loop()
+            session.hints = loop.run_in_executor(self.executor, _solve_hints, session.dictionary,
+                                                 session.engine.board)
+
+    async def _new(self, request: dict) -> dict:
+        """Start a game - in the given session, or in a new one (with the given dictionary)."""
+        board = request.get("board")
+        if (board is not None and not _is_board(board, self.board_size)):
+            raise ValueError("A board is a {0}x{0} list of letters".format(self.board_size))
+        if ("session" in request):
+            session_id = request["session"]
+            session = self._get_session(request)
+        else:
+            dictionary = request.get("dictionary", DEFAULT_DICTIONARY)
+            if (dictionary not in self.words):
+                raise KeyError("No such dictionary: {}".format(dictionary))
+            session_id = uuid.uuid4().hex
+            session = Session(GameEngine(self.words[dictionary], self.board_size, TIMER_COUNTDOWN, self.difficulty),
+                              dictionary)
+            self.sessions[session_id] = session
+        self._start_game(session, board)
+        return {"session": session_id, "state": session.engine.get_state()}
+
+    async def _select(self, request: dict) -> dict:
+        engine = self._get_session(request).engine
+        row, col = request["cell"]
+        selected = engine.select_cell((row, col))
+        return {"selected": selected, "word": engine.curr_word, "is_word": engine.is_curr_word(),
+                "dead_prefix": engine.is_dead_prefix(), "dead_ends": engine.get_dead_end_cells()}
+
+    async def _reset(self, request: dict) -> dict:
+        self._get_session(request).engine.reset_word()
+        return {}
+
+    async def _check(self, request: dict) -> dict:
+        engine = self._get_session(request).engine
+        word = engine.check_word()
+        return {"word": word, "score": engine.curr_score, "running": engine.running}
+
+    async def _hint(self, request: dict) -> dict:
+        """Hint cells of a max-score word, waiting for the board's solve unless asked for
+            a quick hint - which doesn't wait when the solve isn't done yet."""
+        session = self._get_session(request)
+        if (session.hints is None):
+            return {"cells": []}
+        if (request.get("quick") and not session.hints.done()):
+            return {"cells": session.engine.get_quick_hint_cells(), "quick": True}
+        hints = session.hints
+        try:
+            paths = await asyncio.shield(hints)
+        except asyncio.CancelledError:
+            if (not hints.cancelled()):
+                #this request itself was cancelled, not the solve
+                raise
+            #a new game on the session cancelled the solve - the board hinted at is gone
+            return {"cells": [], "cancelled": True}
+        except Exception as error:
+            raise SolveError("Solving the board failed: {!r}".format(error)) from error
+        return {"cells": session.engine.get_hint_cells(paths)}
+
+    async def _state(self, request: dict) -> dict:
+        return {"state": self._get_session(request).engine.get_state()}
+
+    async def _finish(self, request: dict) -> dict:
+        session = self._get_session(request)
+        session.engine.finish_game()
+        return {"score": session.engine.curr_score, "best_score": session.engine.best_score}
+
+    async def _close(self, request: dict) -> dict:
+        self._get_session(request)
+        self._drop(request["session"])
+        return {}
+
+    async def _stats(self, request: dict) -> dict:
+        return {"sessions": len(self.sessions), "dictionaries": sorted(self.words), **self.metrics.report()}
+
+def _is_board(board: object, board_size: int) -> bool:
+    return (isinstance(board, list) and len(board) == board_size and
+            all(isinstance(row, list) and len(row) == board_size and
+                all(isinstance(cell, str) and cell for cell in row) for row in board))
+
+async def _report_loop(server: BoggleServer, interval: float):
+    """Print the server's metrics and drop idle sessions, every interval seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        expired = server.expire_sessions()
+        report = server.metrics.report()
+        ops = " ".join("{}={count}/p50 {p50:.2f}ms/p99 {p99:.2f}ms".format(op, **stats)
+                       for op, stats in sorted(report["ops"].items()))
+        print("{} sessions ({} expired), {:.1f} req/s, {} errors | {}".format(
+            len(server.sessions), expired, report["requests_per_s"], report["errors"], ops), file=sys.stderr)
+
+async def serve(args: argparse.Namespace):
+    #every dictionary is published once to shared memory, the server and the workers attach it
+    lexicons = SharedLexicons()
+    lexicons.publish_compiled(DEFAULT_DICTIONARY, args.lexicon, args.dictionary)
+    for extra in args.extra_lexicon:
+        name, lexicon_path = extra.split("=", 1)
+        lexicons.publish(name, lexicon_path)
+    words = attach_lexicons(lexicons.get_block_names())
+    executor: Optional[Executor] = None
+    if (args.workers > 0):
+        executor = lexicons.executor(args.workers)
+    else:
+        #solve on the event loop's default threads, with the server's own lexicons
+        use_worker_lexicons(words)
+    server = BoggleServer(words, executor, args.board_size, args.difficulty, args.session_ttl)
+    if (args.unix is not None):
+        listener = await asyncio.start_unix_server(server.handle_connection, args.unix, limit=LINE_LIMIT)
+        where = args.unix
+    else:
+        listener = await asyncio.start_server(server.handle_connection, args.host, args.port, limit=LINE_LIMIT)
+        where = "{}:{}".format(args.host, args.port)
+    print("Serving Boggle on {} ({} workers)".format(where, args.workers), file=sys.stderr)
+    reporter = asyncio.ensure_future(_report_loop(server, args.report_interval))
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        reporter.cancel()
+        if (executor is not None):
+            executor.shutdown(cancel_futures=True)
+        for lexicon in words.values():
+            lexicon.close()
+        lexicons.close()
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve Boggle game sessions over JSON lines.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", help="listen on a unix socket at this path instead")
+    parser.add_argument("--dictionary", default=DICTIONARY_PATH, help="words dictionary file")
+    parser.add_argument("--lexicon", default=LEXICON_PATH, help="compiled lexicon file")
+    parser.add_argument("--extra-lexicon", action="append", default=[], metavar="NAME=LEXICON",
+                        help="another compiled lexicon sessions may play with, by name (repeatable)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="hint solver processes, 0 solves on threads of the server process")
+    parser.add_argument("--board-size", type=int, default=BOARD_SIZE)
+    parser.add_argument("--difficulty", default=Difficulty.EASY,
+                        choices=(Difficulty.EASY, Difficulty.MEDIUM, Difficulty.HARD))
+    parser.add_argument("--session-ttl", type=float, default=SESSION_TTL, help="seconds an idle session is kept")
+    parser.add_argument("--report-interval", type=float, default=REPORT_INTERVAL, help="seconds between reports")
+    return parser.parse_args(argv)
+
+def _terminate(signum, frame):
+    #stop like on Ctrl+C, so the shared memory blocks are removed
+    raise KeyboardInterrupt
+
+def main(argv: Optional[List[str]] = None):
+    signal.signal(signal.SIGTERM, _terminate)
+    try:
+        asyncio.run(serve(_parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
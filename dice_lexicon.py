@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from boggle_board_randomizer import BOARD_SIZE, LETTERS
+from Lexicon import Lexicon, compile_lexicon, load_lexicon
+
+Dice = List[List[str]]
+
+DICTIONARY_PATH = "./boggle_dict.txt"
+LEXICON_PATH = "./boggle_dict.lex"
+
+class DiceFilter:
+    """DiceFilter - Tells which words can be spelled, in principle, on a board rolled
+        from a dice list. A word is tokenized into die faces (a "QU" face is one cell,
+        so a Q without a U can't be spelled with it), and it's feasible if it has no more
+        cells than the board and every cell can get its own die showing the face -
+        a matching of the word's cells to the dice. The board's layout isn't considered.
+        Dice are reused on boards bigger than the dice list, as they're dealt by deal_dice:
+        every die at most as many times as the full sets dealt."""
+    def __init__(self, dice_list: Dice = LETTERS, board_size: int = BOARD_SIZE):
+        self.cells = board_size ** 2
+        self.die_uses = -(-self.cells // len(dice_list))
+        #dice showing each face, by die index
+        self.face_dice: Dict[str, List[int]] = {}
+        for die_i, die in enumerate(dice_list):
+            for face in set(die):
+                self.face_dice.setdefault(face, []).append(die_i)
+        self.max_face_length = max(len(face) for face in self.face_dice)
+        #most words have no letter starting a longer face ("QU"), and split into letters only
+        self.letter_faces = frozenset(face for face in self.face_dice if len(face) == 1)
+        self.long_face_starts = frozenset(face[0] for face in self.face_dice if len(face) > 1)
+
+    def is_feasible(self, word: str) -> bool:
+        if (len(word) > self.cells * self.max_face_length):
+            return False
+        return any(self._can_deal(faces) for faces in self.tokenize(word))
+
+    def filter_words(self, words: Iterable[str]) -> Iterator[str]:
+        """Yield the feasible words out of the given words."""
+        return (word for word in words if self.is_feasible(word))
+
+    def tokenize(self, word: str) -> Iterator[List[str]]:
+        """Yield every split of the word into dice faces, none if some letters aren't on any face."""
+        letters = set(word)
+        if (letters.isdisjoint(self.long_face_starts)):
+            if (letters <= self.letter_faces):
+                yield list(word)
+            return
+        splits = [(0, [])]
+        while (len(splits) > 0):
+            start, faces = splits.pop()
+            if (start == len(word)):
+                yield faces
+                continue
+            for end in range(min(len(word), start + self.max_face_length), start, -1):
+                if (word[start:end] in self.face_dice):
+                    splits.append((end, faces + [word[start:end]]))
+
+    def _can_deal(self, faces: List[str]) -> bool:
+        """Check if every face of the word can be dealt its own die (reused up to die_uses times)."""
+        if (len(faces) > self.cells):
+            return False
+        #most words fail on a face with too few dice, before any matching
+        counts = Counter(faces)
+        for face, count in counts.items():
+            if (count > self.die_uses * len(self.face_dice[face])):
+                return False
+        #augmenting paths matching (Kuhn's), dice have die_uses slots each.
+        # faces on fewer dice go first, and a free die is taken before any is freed
+        slots = {}
+        dealt: Dict[int, List[str]] = {}
+
+        def deal(face: str, visited: set) -> bool:
+            face_dice = self.face_dice[face]
+            for die_i in face_dice:
+                if (slots.get(die_i, self.die_uses) > 0):
+                    slots[die_i] = slots.get(die_i, self.die_uses) - 1
+                    dealt.setdefault(die_i, []).append(face)
+                    return True
+            for die_i in face_dice:
+                if (die_i in visited):
+                    continue
+                visited.add(die_i)
+                holders = dealt[die_i]
+                for holder_i, holder in enumerate(holders):
+                    if (deal(holder, visited)):
+                        holders[holder_i] = face
+                        return True
+            return False
+
+        return all(deal(face, set()) for face in sorted(faces, key=lambda face: len(self.face_dice[face])))
+
+def dice_lexicon_path(lexicon_path: str, dice_list: Dice = LETTERS, board_size: int = BOARD_SIZE) -> str:
+    """The path of the lexicon compiled for the given dice and board size, next to the full one -
+        e.g. boggle_dict.4x4-1a2b3c4d.lex. The dice are fingerprinted, so new dice compile a new lexicon."""
+    dice_id = zlib.crc32(json.dumps(dice_list).encode())
+    root, extension = os.path.splitext(lexicon_path)
+    return "{0}.{1}x{1}-{2:08x}{3}".format(root, board_size, dice_id, extension)
+
+def load_dice_lexicon(lexicon_path: str, words_path: str, dice_list: Dice = LETTERS, board_size: int = BOARD_SIZE,
+                      timings: Optional[Dict[str, float]] = None) -> Lexicon:
+    """Open the lexicon of the words feasible with the given dice and board size, compiling
+        it from the words file first if needed (see {load_lexicon}). Every board rolled from
+        these dice is solved the same with it as with the full lexicon, from fewer words."""
+    return load_lexicon(dice_lexicon_path(lexicon_path, dice_list, board_size), words_path, timings,
+                        DiceFilter(dice_list, board_size).filter_words)
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compile a lexicon of only the words a dice set can spell.")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help="board size")
+    parser.add_argument("--dice", help="JSON file of the dice list (default - the classic dice)")
+    parser.add_argument("--dictionary", default=DICTIONARY_PATH, help="words dictionary file")
+    parser.add_argument("--output", help="compiled lexicon file (default - named by the dice and size)")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[Sequence[str]] = None):
+    args = _parse_args(argv)
+    dice_list = LETTERS
+    if (args.dice is not None):
+        with open(args.dice) as dice_file:
+            dice_list = json.load(dice_file)
+    output = args.output or dice_lexicon_path(LEXICON_PATH, dice_list, args.size)
+    with open(args.dictionary) as words_file:
+        words = words_file.read().splitlines()
+    start = time.perf_counter()
+    words_count = compile_lexicon(DiceFilter(dice_list, args.size).filter_words(words), output)
+    elapsed = time.perf_counter() - start
+    print("Compiled {} of {} words to {} in {:.2f}s".format(words_count, len(words), output, elapsed),
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,22 @@
-from typing import List, Tuple, Iterable, Optional, Set, Dict
+from functools import lru_cache
+from threading import Event
+from time import perf_counter
+from itertools import islice
+from typing import List, Tuple, Iterable, Iterator, Optional, Set, Dict, Union
+from Trie import Trie, TrieNode
+from Lexicon import Lexicon
+from SignatureIndex import SignatureIndex, board_signature, letters_signature, signature_fits
+from SolverStats import SolverStats
+from SolutionCache import SolutionCache
 
 Board = List[List[str]]
 Path = List[Tuple[int, int]]
+#inside the solver, a cell (i, j) is encoded as the flat integer i * cols + j
+CellPath = Tuple[int, ...]
+#a prefix index is walked node-by-node - a {Trie} has node objects, a {Lexicon} has node numbers
+PrefixIndex = Union[Trie, Lexicon]
+Node = Union[TrieNode, int]
+PREFIX_INDEX_TYPES = (Trie, Lexicon)
 
 #CONSTS
 OPTIONAL_MOVES = [(-1, -1), (-1, 0), (1, 0), (0, -1), (0, 0), (0, 1), (1, 1), (-1, 1), (1, -1)]
@@ -11,214 +26,412 @@ def is_valid_path(board: Board, path: Path, words: Iterable[str]) -> Optional[st
         Returns the word if its valid, None otherwise."""
     if (isinstance(words, dict)):
         words = words.keys()
+    rows, cols = len(board), len(board[0])
+    neighbor_masks = get_neighbor_masks(rows, cols)
     optinal_word =""
-    previous_row, previous_col = -1, -1
-    for point in path:
-        start_row, start_col= point
-        if _on_board(board ,start_row, start_col):
-            if previous_row + previous_col != -2:
-                space_row = previous_row - start_row
-                space_col = previous_col - start_col
-                if  1 >= space_row >= - 1 and 1 >= space_col >= - 1:
-                    optinal_word += board[start_row][start_col]
-            else:
-                optinal_word += board[start_row][start_col]
-        previous_row, previous_col = start_row, start_col
+    visited = 0
+    previous = -1
+    for row, col in path:
+        if (not (0 <= row < rows and 0 <= col < cols)):
+            return None
+        cell = row * cols + col
+        #a cell is used once, and every move is to a neighbor
+        if (visited >> cell & 1):
+            return None
+        if (previous >= 0 and not neighbor_masks[previous] >> cell & 1):
+            return None
+        visited |= 1 << cell
+        previous = cell
+        optinal_word += board[row][col]
     if optinal_word in words:
         return optinal_word
     else:
         return None
 
-def _on_board(board: Board, row: int, col: int) -> bool:
-    """Check if a location is valid on the board"""
-    if row < len(board) and row >= 0:
-        if col < len(board[0]) and col >= 0:
-            return True
-    return False
+@lru_cache(maxsize=None)
+def get_neighbors(rows: int, cols: int) -> Tuple[Tuple[int, ...], ...]:
+    """Return the neighbors of every flat cell index (row * cols + col) on a board of given
+        size, in the order of the optional moves. The table is built once per board size."""
+    neighbors = []
+    for i in range(rows):
+        for j in range(cols):
+            cell_neighbors = []
+            for move_i, move_j in OPTIONAL_MOVES:
+                next_i, next_j = i + move_i, j + move_j
+                if ((move_i, move_j) != (0, 0) and 0 <= next_i < rows and 0 <= next_j < cols):
+                    cell_neighbors.append(next_i * cols + next_j)
+            neighbors.append(tuple(cell_neighbors))
+    return tuple(neighbors)
 
+@lru_cache(maxsize=None)
+def get_neighbor_masks(rows: int, cols: int) -> Tuple[int, ...]:
+    """Return the neighbors of every flat cell index on a board of given size as a bitmask,
+        so checking if two cells are neighbors is a single bit test."""
+    return tuple(sum(1 << neighbor for neighbor in cell_neighbors)
+                 for cell_neighbors in get_neighbors(rows, cols))
 
-def find_length_n_paths(n: int, board: Board, words: Iterable[str]) -> List[Path]:
-    """Find valid paths of given length on the board using the given words dictionary."""
-    if (isinstance(words, dict)):
-        words = words.keys()
-    words_on_board = set(filter(lambda word: _is_word_on_board(board, word), words))
-    paths: List[Path] = []
-    for i in range(len(board)):
-        for j in range(len(board[0])):
-            #start with current cell
-            start_path = [(i, j)]
-            start_cell = board[i][j]
-            start_words = _words_starts_with(words_on_board, board[i][j])
-            #add length n paths for current cell
-            _find_length_n_paths_helper(n, board, start_words, i, j, start_cell, start_path, paths)
+
+class WordSolution:
+    """WordSolution - All the paths of a single word on a board.
+        Paths are kept encoded as flat cell indices, in the order they were found.
+        The longest path determines the word's score. Without keep_paths, only the
+        longest path and the number of paths are kept (memory bounded by words found)."""
+    __slots__ = ("cols", "paths", "orders", "longest", "order", "count")
+
+    def __init__(self, cols: int, first_path: CellPath, order: int, keep_paths: bool = True):
+        self.cols = cols
+        self.paths: Optional[List[CellPath]] = [first_path] if keep_paths else None
+        #discovery index of each path, used for stable ordering
+        self.orders: Optional[List[int]] = [order] if keep_paths else None
+        self.longest: CellPath = first_path
+        self.order = order
+        self.count = 1
+
+    def add_path(self, path: CellPath, order: int):
+        """Add another path of the word, keeping the first longest path found."""
+        if (self.paths is not None and self.orders is not None):
+            self.paths.append(path)
+            self.orders.append(order)
+        self.count += 1
+        if (len(path) > len(self.longest)):
+            self.longest = path
+            self.order = order
+
+    def get_longest_path(self) -> Path:
+        return _decode_path(self.longest, self.cols)
+
+    def get_paths(self) -> List[Path]:
+        """Return all the paths of the word, only the longest one if they weren't kept."""
+        if (self.paths is None):
+            return [self.get_longest_path()]
+        return [_decode_path(path, self.cols) for path in self.paths]
+
+    def get_score(self) -> int:
+        """Score is calculated by the longest path length squared."""
+        return len(self.longest) ** 2
+
+    def get_path_count(self) -> int:
+        return self.count
+
+
+def find_length_n_paths(n: int, board: Board, words: Iterable[str],
+                        stats: Optional[SolverStats] = None,
+                        solutions: Optional[Dict[str, WordSolution]] = None) -> List[Path]:
+    """Find valid paths of given length on the board using the given words dictionary.
+        The board is searched, unless its {solve_board} result is given (see {_given_solutions})."""
+    solutions = _given_solutions(board, words, stats, solutions)
+    start_time = perf_counter() if stats is not None else 0.0
+    paths = [path for path in _all_paths_in_order(solutions) if len(path) == n]
+    if (stats is not None):
+        stats.on_pass("find_length_n_paths({})".format(n), perf_counter() - start_time)
     return paths
 
-def _find_length_n_paths_helper(n: int, board: Board, words: Set[str], i:int, j: int,
-                              curr_word: str, curr_path: Path, finished_paths: List[Path]):
-    """Iterate the board, find paths of length n that fit a word in the words set.
-        During a spefiic path-trial, filter out words that won't fit."""
-    if (len(curr_path) == n):
-        #finish case: path length is n
-        if (curr_word in words):
-            finished_paths.append(curr_path.copy())
-        return
-    if (len(words) == 0):
-        return
-    
-    for move in OPTIONAL_MOVES:
-        next_i = i + move[0]
-        next_j = j + move[1]
-        if (_safe_to_move(next_i, next_j, board, curr_path)):
-            #move forward
-            new_word = curr_word + board[next_i][next_j]
-            new_path = curr_path + [(next_i, next_j)]
-            #filter out words that won't fit
-            new_words = _words_starts_with(words, new_word)
-            _find_length_n_paths_helper(n, board, new_words, next_i, next_j,
-                                            new_word, new_path, finished_paths)
-
-def _words_starts_with(words: Set[str], word: str) -> Set[str]:
-    """"Return all words from the given Set that starts with the given word."""
-    return set([curr_word for curr_word in words if curr_word.startswith(word)])
-
-
-def find_length_n_words(n: int, board: Board, words: Iterable[str]) -> List[Path]:
-    """Find valid paths for words of given length on the board using the given words dictionary."""
-    if (isinstance(words, dict)):
-        words = words.keys()
-    n_length_words = set(filter(lambda word: len(word) == n, words))
-    n_length_words = set(filter(lambda word: _is_word_on_board(board, word), n_length_words))
-    paths: List[Path] = []
-    for i in range(len(board)):
-        for j in range(len(board[0])):
-            #start with current cell
-            start_path = [(i, j)]
-            start_cell = board[i][j]
-            start_words = _words_starts_with(n_length_words, board[i][j])
-            #add length n words for current cell
-            _find_length_n_word_paths(n, board, start_words, i, j, start_cell, start_path, paths)
+def find_length_n_words(n: int, board: Board, words: Iterable[str],
+                        stats: Optional[SolverStats] = None,
+                        solutions: Optional[Dict[str, WordSolution]] = None) -> List[Path]:
+    """Find valid paths for words of given length on the board using the given words dictionary.
+        The board is searched, unless its {solve_board} result is given (see {_given_solutions})."""
+    solutions = _given_solutions(board, words, stats, solutions)
+    start_time = perf_counter() if stats is not None else 0.0
+    n_length_words = {word: solution for word, solution in solutions.items() if len(word) == n}
+    paths = _all_paths_in_order(n_length_words)
+    if (stats is not None):
+        stats.on_pass("find_length_n_words({})".format(n), perf_counter() - start_time)
     return paths
 
-def _find_length_n_word_paths(n: int, board: Board, words: Set[str], i:int, j: int,
-                              curr_word: str, curr_path: Path, finished_paths: List[Path]):
-    """Iterate the board, find paths that fit a word of length n in the words set.
-        During a spefiic path-trial, filter out words that won't fit."""
-    if (len(curr_word) > n):
-        #in case last cell inserted was bigger than one letter
-        return
-    if (len(curr_word) == n):
-        #finish case: word length is n
-        if (curr_word in words):
-            finished_paths.append(curr_path.copy())
-        return
-    if (len(words) == 0):
-        #prune branches that don't have any words left
-        return
-    
-    for move in OPTIONAL_MOVES:
-        next_i = i + move[0]
-        next_j = j + move[1]
-        if (_safe_to_move(next_i, next_j, board, curr_path)):
-            #move forward
-            new_word = curr_word + board[next_i][next_j]
-            new_path = curr_path + [(next_i, next_j)]
-            #filter out words that won't fit current path
-            new_words = _words_starts_with(words, new_word)
-            _find_length_n_word_paths(n, board, new_words, next_i, next_j,
-                                            new_word, new_path, finished_paths)
-            
-def _safe_to_move(next_i: int, next_j: int, board: Board, path: Path) -> bool:
-    """"Check if the given next location is valid for the current path."""
-    if (next_i >= len(board) or next_i < 0 or next_j >= len(board[0]) or next_j < 0):
-        return False
-    return (next_i, next_j) not in path
-
-def _is_word_on_board(board: Board, word: str):
-    """Check if the word's characters even appear on the board,
-        if they don't appear we don't even need to check them."""
-    all_in_board = ''.join((set(char for row in board for char in row)))
-    for char in word:
-        if (char not in all_in_board):
-            return False
-    return True
-
-def max_score_paths(board: Board, words: Iterable[str]):
+def max_score_paths(board: Board, words: Iterable[str], stop: Optional[Event] = None,
+                    stats: Optional[SolverStats] = None, cache: Optional[SolutionCache] = None,
+                    solutions: Optional[Dict[str, WordSolution]] = None):
     """Get all the max-score paths on the board, for a given words dictionary.
         A max-score path is determined for each word on the board, having the largest
-        path for the specific word."""
-    if (isinstance(words, dict)):
-        words = words.keys()
-    words_on_board = set(filter(lambda word: _is_word_on_board(board, word), words))
-    available_paths = _get_paths_for_each_length(board, words_on_board)
-    existing_words = set()
-    finished_paths: List[Path] = []
-    for length in sorted(available_paths.keys(), reverse=True):
-        for path in available_paths[length]:
-            word = _get_word_from_path(board, path)
-            if (word in existing_words):
-                continue
-            finished_paths.append(path)
-            existing_words.add(word)
-    return finished_paths
-
-def _get_paths_for_each_length(board: Board, words: Iterable[str]) -> Dict[int, List[Path]]:
-    """Get all available paths for each path length, as a dictionary of key-value where
-        the key is the path length, and the value is a list of all paths in that length."""
-    paths = {}
-    words_found: Set[str] = set()
-    words_set: Set[str] = set(words)
-    for i in range(len(board) ** 2, 0, -1):
-        i_paths, words_found = _find_length_n_paths_return_words(i, board, words_set)
-        if (len(i_paths) > 0):
-            paths[i] = i_paths
-            #remove words found - we assume going top to bottom so we always get
-            # the highest score for the word first
-            words_set.difference_update(words_found)
+        path for the specific word. Setting the optional stop event cancels the search
+        (the paths found so far are returned). With a {SolutionCache} (of the same words
+        dictionary), the board - or a rotation or mirror of it - is only solved once.
+        Only the longest path of every word is kept while searching, so big boards are fine.
+        A given {solve_board} result of the board (with or without all paths) isn't searched again."""
+    if (cache is not None):
+        cached_paths = cache.get(board)
+        if (cached_paths is not None):
+            return cached_paths
+    if (solutions is None):
+        solutions = solve_board(board, words, stop, stats, keep_paths=False)
+    start_time = perf_counter() if stats is not None else 0.0
+    paths = [solution.get_longest_path() for solution in
+             sorted(solutions.values(), key=lambda solution: (-len(solution.longest), solution.order))]
+    if (stats is not None):
+        stats.on_pass("max_score_paths", perf_counter() - start_time)
+    if (cache is not None and (stop is None or not stop.is_set())):
+        cache.put(board, paths)
     return paths
 
-def _find_length_n_paths_return_words(n: int, board: Board, words: Iterable[str]) -> Tuple[List[Path], Set[str]]:
-    """"Get all the paths of given length in the given board for a given words dictionary.
-        Alongside the paths, return all the words that match those paths."""
+def solve_board(board: Board, words: Iterable[str], stop: Optional[Event] = None,
+                stats: Optional[SolverStats] = None, keep_paths: bool = True) -> Dict[str, WordSolution]:
+    """Find every word of the given words dictionary on the board in a single board search.
+        Returns the {WordSolution} of each word found - pass it to {max_score_paths},
+        {find_length_n_paths} and {find_length_n_words} to ask about the board again for free.
+        The search is checked for cancellation (the stop event) before every start cell,
+        and its work is traced in the optional stats.
+        Paths never go deeper than the longest word, so the work is bounded by the
+        dictionary's depth rather than the board's area. Without keep_paths, the solutions
+        only keep their longest path - memory is bounded by the number of words found."""
+    start_time = perf_counter() if stats is not None else 0.0
+    trie = _get_prefix_index(board, words)
+    if (stats is not None):
+        stats.on_prefix_index(perf_counter() - start_time)
+    solutions: Dict[str, WordSolution] = {}
+    cols = len(board[0])
+    letters = [cell for row in board for cell in row]
+    neighbors = get_neighbors(len(board), cols)
+    #the search stack is allocated once and shared by all start cells,
+    # a path has at most as many cells as the longest word has letters
+    stack_size = min(len(letters), trie.height(trie.root))
+    path_stack = [0] * stack_size
+    node_stack: List[Node] = [trie.root] * stack_size
+    move_stack = [0] * stack_size
+    counters = [0, 0]
+    found = 0
+    for start in range(len(letters)):
+        if (stop is not None and stop.is_set()):
+            #cancelled - the words found so far are returned
+            break
+        #start with current cell
+        start_time = perf_counter() if stats is not None else 0.0
+        start_node = trie.step(trie.root, letters[start])
+        counters[0], counters[1] = 0, 1
+        if (start_node is not None):
+            path_stack[0], node_stack[0], move_stack[0] = start, start_node, 0
+            counters[1] = 0
+            for depth in _search_paths(trie, letters, neighbors, path_stack, node_stack, move_stack, counters):
+                found = _record_path(solutions, letters, cols, path_stack, depth, found, keep_paths)
+        if (stats is not None):
+            stats.on_start_cell(divmod(start, cols), perf_counter() - start_time, counters[0], counters[1])
+    return solutions
+
+def _given_solutions(board: Board, words: Iterable[str], stats: Optional[SolverStats],
+                     solutions: Optional[Dict[str, WordSolution]]) -> Dict[str, WordSolution]:
+    """Return the given {solve_board} result of the board, or search the board if there's none.
+        A given result must keep all the paths (keep_paths), it's only read."""
+    if (solutions is None):
+        return solve_board(board, words, stats=stats)
+    if (any(solution.paths is None for solution in solutions.values())):
+        raise ValueError("The given solutions only kept their longest paths")
+    return solutions
+
+def iter_words(board: Board, words: Iterable[str], longest_first: bool = False,
+               stop: Optional[Event] = None,
+               stats: Optional[SolverStats] = None) -> Iterator[Tuple[str, Path, int]]:
+    """Lazily search the board, yielding (word, path, score) as soon as a word is found.
+        Every word is yielded once, with the first path found for it and that path's score.
+        Nothing is searched ahead of the consumer, so taking the first results or stopping
+        early (closing the generator, or the stop event) only pays for the search done so far.
+        With longest_first, start cells and moves are tried by the longest word still
+        possible through them, and a word is held back while a longer word may still be found
+        through its path - until the search leaves the word's path, or no word continues it.
+        So longer words come out first (along a path, and mostly across the board), and the
+        wait for the first word is still bounded by the dictionary's depth."""
+    start_time = perf_counter() if stats is not None else 0.0
+    trie = _get_prefix_index(board, words)
+    if (stats is not None):
+        stats.on_prefix_index(perf_counter() - start_time)
+    cols = len(board[0])
+    letters = [cell for row in board for cell in row]
+    neighbors = get_neighbors(len(board), cols)
+    stack_size = min(len(letters), trie.height(trie.root))
+    path_stack = [0] * stack_size
+    node_stack: List[Node] = [trie.root] * stack_size
+    move_stack = [0] * stack_size
+    counters = [0, 0]
+    starts = [(start, trie.step(trie.root, letters[start])) for start in range(len(letters))]
+    if (longest_first):
+        starts.sort(key=lambda start: -1 if start[1] is None else -trie.height(start[1]))
+    seen: Set[str] = set()
+    #longest-first words held back, as (path, word) - every path continues the one below it
+    held: List[Tuple[CellPath, str]] = []
+    for start, start_node in starts:
+        if (stop is not None and stop.is_set()):
+            return
+        start_time = perf_counter() if stats is not None else 0.0
+        counters[0], counters[1] = 0, 1
+        if (start_node is not None):
+            path_stack[0], node_stack[0], move_stack[0] = start, start_node, 0
+            counters[1] = 0
+            for depth in _search_paths(trie, letters, neighbors, path_stack, node_stack, move_stack,
+                                       counters, longest_first):
+                word = "".join([letters[cell] for cell in path_stack[:depth + 1]])
+                if (word in seen):
+                    continue
+                seen.add(word)
+                if (not longest_first):
+                    yield word, _decode_path(path_stack[:depth + 1], cols), (depth + 1) ** 2
+                    continue
+                #the search left the paths of the held words above - nothing longer comes through them
+                while (len(held) > 0 and (len(held[-1][0]) > depth or
+                                          tuple(path_stack[:len(held[-1][0])]) != held[-1][0])):
+                    yield _held_result(held.pop(), cols)
+                if (trie.height(node_stack[depth]) == 0):
+                    yield word, _decode_path(path_stack[:depth + 1], cols), (depth + 1) ** 2
+                else:
+                    held.append((tuple(path_stack[:depth + 1]), word))
+        while (len(held) > 0):
+            yield _held_result(held.pop(), cols)
+        if (stats is not None):
+            stats.on_start_cell(divmod(start, cols), perf_counter() - start_time, counters[0], counters[1])
+
+def _held_result(held: Tuple[CellPath, str], cols: int) -> Tuple[str, Path, int]:
+    path, word = held
+    return word, _decode_path(path, cols), len(path) ** 2
+
+def first_words(board: Board, words: Iterable[str], k: int,
+                longest_first: bool = True) -> List[Tuple[str, Path, int]]:
+    """Return the first k (word, path, score) results of {iter_words}, searching no further."""
+    return list(islice(iter_words(board, words, longest_first), k))
+
+def longest_path_per_word(board: Board, words: Iterable[str],
+                          stop: Optional[Event] = None) -> Dict[str, Path]:
+    """Return exactly one path - the first longest found - of every word on the board.
+        No other path is kept while searching, memory is bounded by the number of words found."""
+    solutions = solve_board(board, words, stop, keep_paths=False)
+    return {word: solution.get_longest_path() for word, solution in solutions.items()}
+
+def count_paths(board: Board, word: str) -> int:
+    """Count the paths spelling the word on the board, without listing them.
+        The search is memoized over (cell, visited cells, letters spelled) states - paths that
+        reach a cell through the same cells, in any order, go on the same way - so the count
+        of a word with many paths is shared between them rather than walked per path."""
+    cols = len(board[0])
+    letters = [cell for row in board for cell in row]
+    neighbors = get_neighbors(len(board), cols)
+    counts: Dict[Tuple[int, int, int], int] = {}
+
+    def count_from(cell: int, visited: int, spelled: int) -> int:
+        if (spelled == len(word)):
+            return 1
+        state = (cell, visited, spelled)
+        if (state not in counts):
+            counts[state] = sum(count_from(neighbor, visited | 1 << neighbor, spelled + len(letters[neighbor]))
+                                for neighbor in neighbors[cell]
+                                if not visited >> neighbor & 1 and word.startswith(letters[neighbor], spelled))
+        return counts[state]
+
+    return sum(count_from(start, 1 << start, len(letters[start]))
+               for start in range(len(letters)) if len(word) > 0 and word.startswith(letters[start]))
+
+def _search_paths(trie: PrefixIndex, letters: List[str], neighbors: Tuple[Tuple[int, ...], ...],
+                  path_stack: List[int], node_stack: List[Node], move_stack: List[int],
+                  counters: List[int], longest_first: bool = False) -> Iterator[int]:
+    """Iterate the board from the cell at the bottom of the stack, yield the depth of the stack
+        whenever the path on it fits a word in the words trie. During a spefiic path-trial, walk
+        the trie and prune prefixes that won't fit. Visited cells are kept as a bitmask, the path
+        lives in the stack. The nodes expanded and moves pruned are added to the counters
+        before every yield, so they're exact even if the search isn't resumed.
+        With longest_first, the moves of every cell are tried by their trie node's height."""
+    step = trie.step
+    is_word = trie.is_word
+    depth = 0
+    nodes = 1
+    pruned = 0
+    visited = 1 << path_stack[0]
+    #longest-first moves are stepped and sorted once per cell, as (next cell, next node)
+    moves_stack: List[List[Tuple[int, Node]]] = []
+    if (longest_first):
+        moves_stack = [[]] * len(path_stack)
+        moves_stack[0] = _sorted_moves(trie, letters, neighbors[path_stack[0]], node_stack[0], visited)
+    if (is_word(node_stack[0])):
+        counters[0] += nodes
+        nodes = 0
+        yield depth
+    while depth >= 0:
+        cell = path_stack[depth]
+        move = move_stack[depth]
+        if (longest_first):
+            cell_moves = moves_stack[depth]
+            if (move == len(cell_moves)):
+                visited ^= 1 << cell
+                depth -= 1
+                continue
+            move_stack[depth] = move + 1
+            next_cell, next_node = cell_moves[move]
+        else:
+            cell_neighbors = neighbors[cell]
+            if (move == len(cell_neighbors)):
+                #all moves tried - step back
+                visited ^= 1 << cell
+                depth -= 1
+                continue
+            move_stack[depth] = move + 1
+            next_cell = cell_neighbors[move]
+            if (visited >> next_cell & 1):
+                continue
+            #move forward - prune prefixes that no word starts with
+            next_node = step(node_stack[depth], letters[next_cell])
+            if (next_node is None):
+                pruned += 1
+                continue
+        depth += 1
+        nodes += 1
+        path_stack[depth], node_stack[depth], move_stack[depth] = next_cell, next_node, 0
+        visited |= 1 << next_cell
+        if (longest_first):
+            moves_stack[depth] = _sorted_moves(trie, letters, neighbors[next_cell], next_node, visited)
+        if (is_word(next_node)):
+            counters[0] += nodes
+            counters[1] += pruned
+            nodes = pruned = 0
+            yield depth
+    counters[0] += nodes
+    counters[1] += pruned
+
+def _sorted_moves(trie: PrefixIndex, letters: List[str], cell_neighbors: Tuple[int, ...], node: Node,
+                  visited: int) -> List[Tuple[int, Node]]:
+    """Return the live moves from a cell as (next cell, next node), the longest words possible first."""
+    moves = []
+    for next_cell in cell_neighbors:
+        if (not visited >> next_cell & 1):
+            next_node = trie.step(node, letters[next_cell])
+            if (next_node is not None):
+                moves.append((next_cell, next_node))
+    moves.sort(key=lambda move: -trie.height(move[1]))
+    return moves
+
+def _record_path(solutions: Dict[str, WordSolution], letters: List[str], cols: int,
+                 path_stack: List[int], depth: int, found: int, keep_paths: bool = True) -> int:
+    """Record the path currently on the stack for the word it spells."""
+    path = tuple(path_stack[:depth + 1])
+    word = "".join([letters[cell] for cell in path])
+    solution = solutions.get(word)
+    if (solution is None):
+        solutions[word] = WordSolution(cols, path, found, keep_paths)
+    else:
+        solution.add_path(path, found)
+    return found + 1
+
+def _decode_path(path: CellPath, cols: int) -> Path:
+    """Transform an encoded path to a list of (row, col) locations."""
+    return [divmod(cell, cols) for cell in path]
+
+def _all_paths_in_order(solutions: Dict[str, WordSolution]) -> List[Path]:
+    """Return all the paths of the given solutions, in the order they were found on the board."""
+    ordered = [(order, path, solution.cols) for solution in solutions.values()
+               for order, path in zip(solution.orders or (), solution.paths or ())]
+    ordered.sort(key=lambda item: item[0])
+    return [_decode_path(path, cols) for _, path, cols in ordered]
+
+def _get_prefix_index(board: Board, words: Iterable[str]) -> PrefixIndex:
+    """Return a prefix index for the given words dictionary. A ready {Trie} or {Lexicon} is
+        used as is, a {SignatureIndex} gives its candidates for the board, and any other
+        iterable is indexed once, keeping only words that may appear on the board."""
+    if (isinstance(words, PREFIX_INDEX_TYPES)):
+        return words
+    if (isinstance(words, SignatureIndex)):
+        return Trie(words.candidates(board))
     if (isinstance(words, dict)):
         words = words.keys()
-    words_on_board = set(filter(lambda word: _is_word_on_board(board, word), words))
-    words_found: Set[str] = set()
-    paths: List[Path] = []
-    for i in range(len(board)):
-        for j in range(len(board[0])):
-            #start with current cell
-            start_path = [(i, j)]
-            start_cell = board[i][j]
-            start_words = _words_starts_with(words_on_board, board[i][j])
-            #add length n paths for current cell
-            _find_length_n_paths_return_words_helper(n, board, start_words, words_found, i, j, start_cell, start_path, paths)
-    return (paths, words_found)
-
-def _find_length_n_paths_return_words_helper(n: int, board: Board, words: Set[str], words_found: Set[str],
-                                             i:int, j: int,curr_word: str, curr_path: Path, finished_paths: List[Path]):
-    """Iterate the board, find paths of length n that fit a word in the words set.
-        During a spefiic path-trial, filter out words that won't fit."""
-    if (len(curr_path) == n):
-        #finish case: path length is n
-        if (curr_word in words):
-            words_found.add(curr_word)
-            finished_paths.append(curr_path.copy())
-        return
-    #prune branches that don't have any words left
-    if (len(words) == 0):
-        return
-    
-    for move in OPTIONAL_MOVES:
-        next_i = i + move[0]
-        next_j = j + move[1]
-        if (_safe_to_move(next_i, next_j, board, curr_path)):
-            #move forward
-            new_word = curr_word + board[next_i][next_j]
-            new_path = curr_path + [(next_i, next_j)]
-            #filter out words that won't fit current path
-            new_words = _words_starts_with(words, new_word)
-            _find_length_n_paths_return_words_helper(n, board, new_words, words_found, next_i, next_j,
-                                                     new_word, new_path, finished_paths)
+    #cheap letters check first, letter counts only for the words that pass it
+    board_letters = set(char for row in board for cell in row for char in cell)
+    board_sig = board_signature(board)
+    return Trie(word for word in words if board_letters.issuperset(word)
+                and signature_fits(board_sig, letters_signature(word)))
+
 
 def _get_word_from_path(board: Board, path: Path) -> str:
     """Transform given path on a given board to the matching word representation of it."""
@@ -0,0 +1,38 @@
+import random
+import pytest
+from boggle_board_randomizer import LETTERS, deal_dice
+from ex11_utils import solve_board
+from IncrementalSolver import IncrementalSolver
+from Lexicon import Lexicon, lexicon_bytes
+from Trie import Trie
+
+SAMPLE_WORDS = 30000
+CHANGES = 30
+
+@pytest.fixture(scope="module")
+def words():
+    with open("boggle_dict.txt") as words_file:
+        all_words = words_file.read().split()
+    return random.Random(7).sample(all_words, SAMPLE_WORDS)
+
+def _roll_board(rng: random.Random, size: int):
+    letters = [rng.choice(LETTERS[die]) for die in deal_dice(len(LETTERS), size * size, rng)]
+    return [letters[row * size:(row + 1) * size] for row in range(size)]
+
+def _path_sets(paths):
+    return {word: set(word_paths) for word, word_paths in paths.items()}
+
+@pytest.mark.parametrize("index", ["trie", "lexicon"])
+@pytest.mark.parametrize("size", [4, 6])
+def test_replace_cell_matches_a_full_solve(words, index, size):
+    prefix_index = Trie(words) if index == "trie" else Lexicon.from_buffer(lexicon_bytes(words)[1], "test")
+    rng = random.Random(size)
+    board = _roll_board(rng, size)
+    solver = IncrementalSolver(board, prefix_index)
+    for _ in range(CHANGES):
+        row, col = rng.randrange(size), rng.randrange(size)
+        letters = rng.choice(rng.choice(LETTERS))
+        solver.replace_cell((row, col), letters)
+        board[row][col] = letters
+        full = {word: solution.paths for word, solution in solve_board(board, prefix_index).items()}
+        assert _path_sets(solver.paths) == _path_sets(full)
@@ -0,0 +1,28 @@
+from SolutionStore import SolutionStore
+
+def test_pop_best_skips_removed_words_and_starts_over():
+    store = SolutionStore(4)
+    store.add("AB", [(0, 0), (0, 1)])
+    store.add("ABC", [(0, 0), (0, 1), (0, 2)])
+    assert store.pop_best() == ("ABC", [(0, 0), (0, 1), (0, 2)])
+    store.remove("AB")
+    #only the stale entry of AB is left in the heap - ABC is popped again
+    assert store.pop_best() == ("ABC", [(0, 0), (0, 1), (0, 2)])
+    assert len(store) == 1
+
+def test_replaced_word_is_popped_once_per_cycle():
+    store = SolutionStore(4)
+    store.add("AB", [(0, 0), (0, 1)])
+    store.add("AB", [(1, 0), (1, 1)])
+    store.add("CD", [(2, 0), (2, 1)])
+    popped = [store.pop_best(), store.pop_best()]
+    assert sorted(word for word, _ in popped) == ["AB", "CD"]
+    assert ("AB", [(1, 0), (1, 1)]) in popped
+
+def test_lookup_and_removal_by_path():
+    store = SolutionStore(4)
+    store.add("AB", [(0, 0), (0, 1)])
+    assert store.get_word([(0, 0), (0, 1)]) == "AB"
+    assert store.remove_path([(0, 0), (0, 1)])
+    assert "AB" not in store
+    assert store.pop_best() is None
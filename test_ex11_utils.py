@@ -0,0 +1,29 @@
+import random
+from boggle_board_randomizer import LETTERS, deal_dice
+from ex11_utils import count_paths, longest_path_per_word, solve_board
+from Trie import Trie
+
+def _roll_board(rng: random.Random, size: int):
+    letters = [rng.choice(LETTERS[die]) for die in deal_dice(len(LETTERS), size * size, rng)]
+    return [letters[row * size:(row + 1) * size] for row in range(size)]
+
+def test_count_paths_matches_the_paths_found():
+    with open("boggle_dict.txt") as words_file:
+        words = Trie(random.Random(7).sample(words_file.read().split(), 30000))
+    rng = random.Random(11)
+    for size in (4, 5):
+        board = _roll_board(rng, size)
+        for word, solution in solve_board(board, words).items():
+            assert count_paths(board, word) == solution.count == len(solution.paths)
+
+def test_count_paths_of_repeated_letters():
+    #every ordering of the 4 cells is a path - 4 * 3 * 2 * 1
+    board = [["E", "E"], ["E", "E"]]
+    assert count_paths(board, "EEEE") == 24
+    assert count_paths(board, "EEEEE") == 0
+    assert count_paths(board, "X") == 0
+
+def test_longest_path_per_word_keeps_one_longest_path():
+    board = [["A", "B"], ["QU", "A"]]
+    paths = longest_path_per_word(board, Trie(["AB", "ABA", "QUA"]))
+    assert paths == {"AB": [(0, 0), (0, 1)], "ABA": [(0, 0), (0, 1), (1, 1)], "QUA": [(1, 0), (0, 0)]}